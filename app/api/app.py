@@ -7,6 +7,7 @@ import sentry_sdk
 import fastapi
 
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 
 from prometheus_fastapi_instrumentator import Instrumentator
 from sentry_sdk.integrations.sqlalchemy import SqlalchemyIntegration
@@ -15,6 +16,9 @@ from uvicorn.config import LOGGING_CONFIG
 from app.api.admin import create_admin
 from app.api.routes.root import router
 from app.config import settings
+from app.constants import GZIP_MINIMUM_RESPONSE_SIZE
+from app.database.manager import DatabaseManagerAsync
+from app.log import default_logger
 from app.utils.utility import create_superuser
 
 if settings.sentry:
@@ -47,11 +51,18 @@ app.add_middleware(
         allow_methods=["*"],
         allow_headers=["*"],
     )
+# json lists (recipes, catalogs) contain a lot of repeating strings, so they are compressed well
+app.add_middleware(GZipMiddleware, minimum_size=GZIP_MINIMUM_RESPONSE_SIZE)
 
 
 @app.on_event("startup")
 async def startup():
     """startup methods for FastAPI application"""
+    try:
+        await DatabaseManagerAsync.get_instance().warm_up_pool()
+    except Exception:
+        # connections will be opened on demand, so service can start without warm pool
+        default_logger.exception("Database connections pool warm up failed")
     if settings.environment == "development":
         await create_superuser()
 
@@ -15,14 +15,14 @@ from app.api.routes.v1.blog.views.stories import get_stories_view, put_story_vie
 from app.api.routes.v1.utils.auth import get_user_by_token, get_admin_by_token
 from app.api.routes.v1.utils.service_models import UserModel
 from app.constants import MAX_ARTICLES_COUNT
-from app.database import DatabaseManagerAsync
+from app.database import get_session
 
 router = APIRouter(prefix="/blog")
 
 
 @router.get("/stories", response_model=GetStoriesResponseModel)
 async def get_stories(
-        session: AsyncSession = Depends(DatabaseManagerAsync.get_instance().get_session_object),
+        session: AsyncSession = Depends(get_session),
 ) -> GetStoriesResponseModel:
     """
     Returns last app.constantsMAX_STORIES_COUNT stories.
@@ -39,7 +39,7 @@ async def put_story(
         title: str = Form(...),
         thumbnail: UploadFile = Form(...),
         images: List[UploadFile] = Form(...),
-        session: AsyncSession = Depends(DatabaseManagerAsync.get_instance().get_session_object),
+        session: AsyncSession = Depends(get_session),
         current_user: UserModel = Depends(get_admin_by_token),
 ):
     """
@@ -63,7 +63,7 @@ async def put_story(
 @router.delete("/stories", response_model=DefaultResponse, dependencies=[Depends(get_admin_by_token)])
 async def delete_story(
         story_id: int,
-        session: AsyncSession = Depends(DatabaseManagerAsync.get_instance().get_session_object),
+        session: AsyncSession = Depends(get_session),
         current_user: UserModel = Depends(get_admin_by_token),
 ):
     """
@@ -83,7 +83,7 @@ async def delete_story(
 
 @router.get("/articles", response_model=GetArticlesResponseModel)
 async def get_articles(
-        session: AsyncSession = Depends(DatabaseManagerAsync.get_instance().get_session_object),
+        session: AsyncSession = Depends(get_session),
         articles_count: int = MAX_ARTICLES_COUNT,
         full_time: bool = False,
 ) -> GetArticlesResponseModel:
@@ -104,7 +104,7 @@ async def put_article(
         image: UploadFile = Form(...),
         subtitle: str = Form(...),
         text: str = Form(...),
-        session: AsyncSession = Depends(DatabaseManagerAsync.get_instance().get_session_object),
+        session: AsyncSession = Depends(get_session),
         current_user: UserModel = Depends(get_admin_by_token),
 ) -> DefaultResponse:
     """
@@ -135,7 +135,7 @@ async def update_article(
         image: Optional[UploadFile] = File(default=None),
         subtitle: str = Form(...),
         text: str = Form(...),
-        session: AsyncSession = Depends(DatabaseManagerAsync.get_instance().get_session_object),
+        session: AsyncSession = Depends(get_session),
         admin_user: UserModel = Depends(get_admin_by_token),
 ) -> DefaultResponse:
     """
@@ -164,7 +164,7 @@ async def update_article(
 @router.delete("/articles", response_model=DefaultResponse)
 async def delete_article(
         article_id: int,
-        session: AsyncSession = Depends(DatabaseManagerAsync.get_instance().get_session_object),
+        session: AsyncSession = Depends(get_session),
         admin_user: UserModel = Depends(get_admin_by_token),
 ) -> DefaultResponse:
     """
@@ -11,7 +11,7 @@ from app.api.routes.v1.groups.views import add_group_view, remove_group_view, ch
 from app.api.routes.v1.users.models import GroupRequestModel, GroupChangeRequestModel, \
     AddUserToGroupRequestModel
 from app.api.routes.v1.utils.auth import get_admin_by_token
-from app.database import DatabaseManagerAsync
+from app.database import get_session
 
 router = APIRouter(prefix="/groups")
 
@@ -19,7 +19,7 @@ router = APIRouter(prefix="/groups")
 @router.post("/", response_model=DefaultResponse, dependencies=[Depends(get_admin_by_token)])
 async def add_group(
         group_model: GroupRequestModel,
-        session: AsyncSession = Depends(DatabaseManagerAsync.get_instance().get_session_object)
+        session: AsyncSession = Depends(get_session)
 ) -> DefaultResponse:
     """
     Creates new group with name passed via **group_model: GroupRequestModel**. If group already exists, it throws
@@ -35,7 +35,7 @@ async def add_group(
 @router.delete("/", response_model=DefaultResponse, dependencies=[Depends(get_admin_by_token)])
 async def remove_group(
         group_model: GroupRequestModel,
-        session: AsyncSession = Depends(DatabaseManagerAsync.get_instance().get_session_object)
+        session: AsyncSession = Depends(get_session)
 ) -> DefaultResponse:
     """
     Deletes group with name passed via **group_model: GroupRequestModel**. If group not found by name, it throws
@@ -51,7 +51,7 @@ async def remove_group(
 @router.patch("/", response_model=DefaultResponse, dependencies=[Depends(get_admin_by_token)])
 async def change_group_name(
         group_model: GroupChangeRequestModel,
-        session: AsyncSession = Depends(DatabaseManagerAsync.get_instance().get_session_object)
+        session: AsyncSession = Depends(get_session)
 ) -> DefaultResponse:
     """
     Changes existing group name. If group not found by name, it throws
@@ -67,7 +67,7 @@ async def change_group_name(
 @router.post("/add_user_to_group", response_model=DefaultResponse, dependencies=[Depends(get_admin_by_token)])
 async def add_user_to_group(
         group_model: AddUserToGroupRequestModel,
-        session: AsyncSession = Depends(DatabaseManagerAsync.get_instance().get_session_object)
+        session: AsyncSession = Depends(get_session)
 ) -> DefaultResponse:
     """
     Adds user to a group. If group does not exist, then creates a new one. If user already exists, it throws
@@ -84,7 +84,7 @@ async def add_user_to_group(
 @router.post("/remove_user_from_group", response_model=DefaultResponse, dependencies=[Depends(get_admin_by_token)])
 async def remove_user_from_group(
         group_model: AddUserToGroupRequestModel,
-        session: AsyncSession = Depends(DatabaseManagerAsync.get_instance().get_session_object)
+        session: AsyncSession = Depends(get_session)
 ) -> DefaultResponse:
     """
     Method removes user from group. If user not in group, it throws
@@ -99,7 +99,7 @@ async def remove_user_from_group(
 
 @router.get("/get_all", response_model=AvailableGroupsResponseModel, dependencies=[Depends(get_admin_by_token)])
 async def get_available_groups(
-    session: AsyncSession = Depends(DatabaseManagerAsync.get_instance().get_session_object)
+    session: AsyncSession = Depends(get_session)
 ) -> DefaultResponse:
     """
     Method returns all available users groups
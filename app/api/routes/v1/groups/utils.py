@@ -1,4 +1,5 @@
 """Utility methods for groups: Groups manipulation"""
+from typing import Dict, Iterable
 
 import sqlalchemy
 from fastapi import HTTPException
@@ -80,3 +81,24 @@ async def get_group_model_or_create_if_not_exists(group_name: str, session):
     else:
         session.add(found_group := Groups(name=group_name))
         return found_group
+
+
+async def get_group_models_or_create_if_not_exist(group_names: Iterable[str], session) -> Dict[str, "Groups"]:
+    """
+    Method checks user groups: Groups in database by names with one query. Groups that do not exist will be created.
+
+    :param group_names: group names for search
+    :param session: SQLAlchemy AsyncSession object
+    :return: Groups mapped objects by names
+    """
+    from app.database.models.base import Groups
+    group_names = set(group_names)
+    found_groups = {}
+    if group_names:
+        response = await session.execute(sqlalchemy.select(Groups).where(Groups.name.in_(group_names)))
+        for group in response.scalars():
+            found_groups.setdefault(group.name, group)
+    for group_name in group_names - found_groups.keys():
+        found_groups[group_name] = Groups(name=group_name)
+        session.add(found_groups[group_name])
+    return found_groups
@@ -14,10 +14,34 @@ from app.api.routes.v1.groups.utils import (
     get_group_model_or_create_if_not_exists)
 from app.api.routes.v1.users.models import GroupRequestModel, GroupChangeRequestModel, \
     AddUserToGroupRequestModel
-from app.api.routes.v1.utils.auth import check_user_is_in_group
+from app.api.routes.v1.recipes.cache import clear_recipes_caches, recipes_list_cache
+from app.api.routes.v1.utils.auth import check_user_is_in_group, users_by_token_cache, remove_cached_user
 from app.database.models.base import Users, Groups
 
 
+def clear_groups_dependent_caches() -> None:
+    """
+    Method clears caches, that depend on users groups: cached users by token (contain groups of user) and
+    recipes lists (recipes are filtered by user groups). Should be called after groups changes are committed.
+
+    :return: None
+    """
+    users_by_token_cache.clear()
+    clear_recipes_caches()
+
+
+def clear_user_groups_dependent_caches(user_id: int) -> None:
+    """
+    Method clears cached user by token and recipes lists of one user. Should be called after groups of this user
+    are changed and committed.
+
+    :param user_id: id of user
+    :return: None
+    """
+    remove_cached_user(user_id)
+    recipes_list_cache.pop(user_id)
+
+
 async def add_group_view(
         group_model: GroupRequestModel,
         session: AsyncSession
@@ -47,7 +71,9 @@ async def remove_group_view(
     """
     async with session.begin():
         await remove_group(group_name=group_model.group_name, session=session)
-        return DefaultResponse(detail="Группа удалена")
+    # cached users by token and recipes lists contain old groups
+    clear_groups_dependent_caches()
+    return DefaultResponse(detail="Группа удалена")
 
 
 async def change_group_name_view(
@@ -66,7 +92,8 @@ async def change_group_name_view(
             old_group_name=group_model.old_group_name,
             new_group_name=group_model.new_group_name,
             session=session)
-        return DefaultResponse(detail="Имя группы изменено")
+    clear_groups_dependent_caches()
+    return DefaultResponse(detail="Имя группы изменено")
 
 
 async def add_user_to_group_view(
@@ -97,7 +124,8 @@ async def add_user_to_group_view(
             # and then adds user to this group
             user.groups.append(await get_group_model_or_create_if_not_exists(
                 group_name=group_model.group_name, session=session))
-            return DefaultResponse(detail="Пользователь добавлен в группу")
+    clear_user_groups_dependent_caches(group_model.user_id)
+    return DefaultResponse(detail="Пользователь добавлен в группу")
 
 
 async def remove_user_from_group_view(
@@ -119,7 +147,8 @@ async def remove_user_from_group_view(
         # now search group object and remove it from user groups
         needed_group = list(filter(lambda x: x.name == group_model.group_name, user.groups))[0]
         user.groups.remove(needed_group)
-        return DefaultResponse(detail=f"Пользователь удален из группы {group_model.group_name}")
+    clear_user_groups_dependent_caches(group_model.user_id)
+    return DefaultResponse(detail=f"Пользователь удален из группы {group_model.group_name}")
 
 
 async def get_available_groups_view(session: AsyncSession):
@@ -0,0 +1,72 @@
+"""In-process caches for recipes routes"""
+from typing import Awaitable, Callable, Optional
+
+from fastapi import Request, Response
+
+from app.api.routes.v1.utils.utility import serialize_with_etag, build_json_response_with_etag
+from app.constants import (
+    RECIPES_LIST_CACHE_TTL,
+    RECIPES_LIST_CACHE_USERS_SIZE,
+    RECIPES_LIST_CACHE_USER_SIZE,
+    CATALOG_CACHE_TTL)
+from app.utils.cache import TTLCache
+
+# serialized recipes lists of user as TTLCache of (etag, body) by list key. Lists are cached by user id
+# (None for not authenticated users), because recipes contain 'liked' field. Both users count and lists count
+# of one user are bounded, so cache size does not depend on requested filters. Cache is not shared between
+# workers, so after like toggle other workers can return old 'liked' state for up to RECIPES_LIST_CACHE_TTL
+recipes_list_cache = TTLCache(ttl=RECIPES_LIST_CACHE_TTL, maxsize=RECIPES_LIST_CACHE_USERS_SIZE)
+
+# response models of catalog routes (categories, ingredients, dimensions, ingredient groups, compilations).
+# Catalogs are changed rarely, so cache is fully cleared on any recipe, category or compilation change
+catalog_cache = TTLCache(ttl=CATALOG_CACHE_TTL)
+
+
+def get_user_recipes_lists(user_id: Optional[int]) -> TTLCache:
+    """
+    Method returns cached recipes lists of user. All lists of user expire together, so user lists can be dropped
+    with one pop when user likes change.
+
+    :param user_id: id of user or None for not authenticated user
+    :return: Cache of serialized recipes lists as (etag, body) by list key
+    """
+    user_lists = recipes_list_cache.get(user_id)
+    if user_lists is None:
+        user_lists = TTLCache(ttl=RECIPES_LIST_CACHE_TTL, maxsize=RECIPES_LIST_CACHE_USER_SIZE)
+        recipes_list_cache.set(user_id, user_lists)
+    return user_lists
+
+
+async def build_cached_recipes_list_response(
+        request: Request,
+        user_id: Optional[int],
+        list_key: Optional[tuple],
+        build_list: Callable[[], Awaitable[dict]],
+) -> Response:
+    """
+    Method returns recipes list response with ETag from user lists cache. If list is not cached, then it is built,
+    serialized and cached.
+
+    :param request: Request object
+    :param user_id: id of user or None for not authenticated user
+    :param list_key: key of list in user lists cache. If None, then list is not cached
+    :param build_list: function that builds recipes list in GetRecipesResponseModel shape
+    :return: Response object
+    """
+    user_lists = get_user_recipes_lists(user_id) if list_key is not None else None
+    if user_lists is None or (cached := user_lists.get(list_key)) is None:
+        cached = serialize_with_etag(await build_list())
+        if user_lists is not None:
+            user_lists.set(list_key, cached)
+    etag, body = cached
+    return build_json_response_with_etag(request, etag, body)
+
+
+def clear_recipes_caches() -> None:
+    """
+    Method clears recipes list and catalogs caches. Should be called after recipes data changes.
+
+    :return: None
+    """
+    recipes_list_cache.clear()
+    catalog_cache.clear()
@@ -4,7 +4,8 @@ Recipes router module. Contains all routes that interact with recipes.
 
 from typing import List, Optional, Union
 
-from fastapi import Depends, UploadFile, Form, File, APIRouter, Body, Query, HTTPException
+from fastapi import Depends, UploadFile, Form, File, APIRouter, Body, Query, HTTPException, Request
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
@@ -12,10 +13,11 @@ from app.api.routes.default_response_models import DefaultResponse, DefaultRespo
 from app.api.routes.v1.recipes.utility_classes import (
     GetRecipesResponseModel, RecipeResponseModel, RecipeCategoriesResponseModel,
     RecipeLikesRequestModel, FindResponseModel, RecipeCompilationsResponseModel,
-    CreateCompilationRequestModel, GetIngredientsResponseModel, GetDimensionsResponseModel,
+    GetIngredientsResponseModel, GetDimensionsResponseModel,
     GetIngredientGroupsResponseModel, GetIngredientsWithGroupsResponseModel, RecipeOneCompilationResponseModel,
-    UpdateCompilationRequestModel, RecipeCategoryResponseModel)
-from app.api.routes.v1.recipes.utils import get_category_image
+    UpdateCompilationRequestModel, RecipeCategoryResponseModel, CreateRecipeForm, UpdateRecipeForm)
+from app.api.routes.v1.recipes.cache import build_cached_recipes_list_response, clear_recipes_caches
+from app.api.routes.v1.recipes.utils import select_categories_with_images
 from app.api.routes.v1.recipes.views.default import get_recipes_view, get_recipe_view, delete_recipe_view, \
     create_recipe_view, update_recipe_view, get_liked_recipes_view, get_recipes_by_ingredient_view, \
     get_recipes_by_category_view
@@ -26,62 +28,90 @@ from app.api.routes.v1.recipes.views.utility import get_recipes_categories_view,
     get_one_compilation_view, update_recipes_compilation_view, delete_recipes_compilation_view
 from app.api.routes.v1.utils.auth import get_user_by_token, get_admin_by_token, get_user_by_token_or_none
 from app.api.routes.v1.utils.service_models import UserModel
-from app.api.routes.v1.utils.utility import build_full_path
-from app.database import DatabaseManagerAsync
+from app.api.routes.v1.utils.utility import build_full_path, build_json_response_with_etag
+from app.database import get_session
+from app.constants import DEFAULT_RECIPES_PAGE_SIZE, MAX_RECIPES_PAGE_SIZE
 from app.database.models.base import RecipeCategories, Ingredients
 from app.utils import S3Manager
 
-router = APIRouter(prefix="/recipes")
+router = APIRouter(prefix="/recipes", default_response_class=ORJSONResponse)
 
 
 @router.get("/", response_model=GetRecipesResponseModel)
 async def get_recipes(
-        session: AsyncSession = Depends(DatabaseManagerAsync.get_instance().get_session_object),
+        request: Request,
+        session: AsyncSession = Depends(get_session),
         current_user: Optional[UserModel] = Depends(get_user_by_token_or_none),
         prefer_ingredients: Union[List[str], None] = Query(default=None),
         exclude_groups: Union[List[str], None] = Query(default=None),
         include_categories: Union[List[str], None] = Query(default=None),
-        compilation: Union[str, None] = Query(default=None)
+        compilation: Union[str, None] = Query(default=None),
+        last_id: Union[int, None] = Query(default=None),
+        limit: int = Query(default=DEFAULT_RECIPES_PAGE_SIZE, gt=0, le=MAX_RECIPES_PAGE_SIZE),
 ) -> GetRecipesResponseModel:
     """
     Route that search all recipes that stored in database and return them with filtering.
+    Lists are cached for a short time and support ETag / If-None-Match.
 
+    :param request: Request object
     :param session: SQLAlchemy AsyncSession
     :param current_user: User information object
     :param prefer_ingredients: Exclude recipes that don't contain these ingredients
     :param exclude_groups: Exclude recipe with this groups
     :param include_categories: Exclude recipes that don't have these ingredients
     :param compilation: Exclude recipes that not in this compilation
+    :param last_id: Id of the last recipe from previous page (keyset pagination)
+    :param limit: Page size (at most MAX_RECIPES_PAGE_SIZE). If not passed, DEFAULT_RECIPES_PAGE_SIZE is used
     :return: Recipes list
     """
-    return await get_recipes_view(
-        prefer_ingredients,
-        exclude_groups,
-        include_categories,
-        compilation,
-        session,
-        current_user)
+    # only first page without filters is cached (already serialized by user), because it is requested on every
+    # application start. Filtered lists and next pages have too many variants to be cached
+    is_cacheable = last_id is None and not any((prefer_ingredients, exclude_groups, include_categories, compilation))
+    return await build_cached_recipes_list_response(
+        request,
+        user_id=current_user.id if current_user else None,
+        list_key=("all", limit) if is_cacheable else None,
+        build_list=lambda: get_recipes_view(
+            prefer_ingredients,
+            exclude_groups,
+            include_categories,
+            compilation,
+            session,
+            current_user,
+            last_id=last_id,
+            limit=limit))
 
 
 @router.get("/liked", response_model=GetRecipesResponseModel)
 async def get_liked_recipes(
-        session: AsyncSession = Depends(DatabaseManagerAsync.get_instance().get_session_object),
+        request: Request,
+        session: AsyncSession = Depends(get_session),
         current_user: UserModel = Depends(get_user_by_token),
+        last_id: Union[int, None] = Query(default=None),
+        limit: int = Query(default=DEFAULT_RECIPES_PAGE_SIZE, gt=0, le=MAX_RECIPES_PAGE_SIZE),
 ):
     """
     Route that returns liked (bu request user) recipes.
 
+    :param request: Request object
     :param session: SQLAlchemy AsyncSession object.
     :param current_user: User information object.
+    :param last_id: Id of the last recipe from previous page (keyset pagination)
+    :param limit: Page size (at most MAX_RECIPES_PAGE_SIZE). If not passed, DEFAULT_RECIPES_PAGE_SIZE is used
     :return: Recipes list.
     """
-    return await get_liked_recipes_view(session, current_user)
+    # only first page is cached
+    return await build_cached_recipes_list_response(
+        request,
+        user_id=current_user.id,
+        list_key=("liked", limit) if last_id is None else None,
+        build_list=lambda: get_liked_recipes_view(session, current_user, last_id=last_id, limit=limit))
 
 
 @router.get("/one/{recipe_id}", response_model=RecipeResponseModel)
 async def get_recipe(
         recipe_id: int,
-        session: AsyncSession = Depends(DatabaseManagerAsync.get_instance().get_session_object),
+        session: AsyncSession = Depends(get_session),
         current_user: UserModel = Depends(get_user_by_token_or_none)
 ):
     """
@@ -93,13 +123,15 @@ async def get_recipe(
     :param current_user: User information object.
     :return: Found recipe.
     """
-    return await get_recipe_view(recipe_id=recipe_id, session=session, current_user=current_user)
+    recipe = await get_recipe_view(recipe_id=recipe_id, session=session, current_user=current_user)
+    # recipe is built in response model shape by view, so response is returned without validation
+    return ORJSONResponse(recipe)
 
 
 @router.delete("/{recipe_id}", response_model=DefaultResponse)
 async def delete_recipe(
         recipe_id: int,
-        session: AsyncSession = Depends(DatabaseManagerAsync.get_instance().get_session_object),
+        session: AsyncSession = Depends(get_session),
         current_user: UserModel = Depends(get_user_by_token),
 ):
     """
@@ -115,105 +147,80 @@ async def delete_recipe(
 
 @router.post("/", response_model=DefaultResponseWithPayload)
 async def create_recipe(
-        title: str = Form(),
+        form: CreateRecipeForm = Depends(CreateRecipeForm.as_form),
         image: UploadFile = File(default=None),
-        time: int = Form(),
-        complexity: str = Form(),
-        servings: int = Form(),
-        categories: str = Form(),
-        steps: str = Form(),
-        ingredients: str = Form(),
-        allowed_groups: Optional[str] = Form(None),
-        session: AsyncSession = Depends(DatabaseManagerAsync.get_instance().get_session_object),
+        session: AsyncSession = Depends(get_session),
         current_user: UserModel = Depends(get_admin_by_token)):
     """
     Route for adding new recipe.
 
-    :param title: Recipe title.
+    :param form: Recipe form fields (title, cooking time, complexity, servings, categories, steps, ingredients
+    and allowed groups). Check CreateRecipeForm.
     :param image: Recipe image.
-    :param time: Recipe cooking time.
-    :param complexity: Recipe complexity (easy / medium / etc...).
-    :param servings: Recipe servings count.
-    :param categories: Recipe categories.
-    :param steps: Recipe steps.
-    :param ingredients: Recipe ingredients.
-    :param allowed_groups: List of user groups allowed to watch this recipe
     :param session: SQLAlchemy AsyncSession object.
     :param current_user: User information object.
     :return: Response with status and added recipe id.
     """
-    return await create_recipe_view(title=title,
+    return await create_recipe_view(title=form.title,
                                     image=image,
-                                    time=time,
-                                    complexity=complexity,
-                                    servings=servings,
-                                    categories=categories,
-                                    steps=steps,
-                                    ingredients=ingredients,
-                                    allowed_groups=allowed_groups,
+                                    time=form.time,
+                                    complexity=form.complexity,
+                                    servings=form.servings,
+                                    categories=form.categories,
+                                    steps=form.steps,
+                                    ingredients=form.ingredients,
+                                    allowed_groups=form.allowed_groups,
                                     session=session,
                                     current_user=current_user)
 
 
 @router.patch("/", response_model=DefaultResponse)
 async def update_recipe(
-        recipe_id: int = Form(None),
-        title: Optional[str] = Form(None),
+        form: UpdateRecipeForm = Depends(UpdateRecipeForm.as_form),
         image: Optional[UploadFile] = File(default=None),
-        time: Optional[int] = Form(None),
-        complexity: Optional[str] = Form(None),
-        servings: Optional[int] = Form(None),
-        categories: Optional[str] = Form(None),
-        steps: Optional[str] = Form(None),
-        ingredients: Optional[str] = Form(None),
-        allowed_groups: Optional[str] = Form(None),
-        session: AsyncSession = Depends(DatabaseManagerAsync.get_instance().get_session_object),
+        session: AsyncSession = Depends(get_session),
         current_user: UserModel = Depends(get_user_by_token),
 ):
     """
     Route for updating recipe information.
 
-    :param recipe_id: Id of recipe that should be updated.
-    :param title: New recipe title. (Optional, model field title will be changed if value passed).
+    :param form: Recipe id and new recipe fields. Model fields will be changed only for passed values.
+    Check UpdateRecipeForm.
     :param image: New recipe image. (Optional, model field image will be changed if value passed).
-    :param time: New recipe cooking time. (Optional, model field time will be changed if value passed).
-    :param complexity: New recipe complexity. (Optional, model field complexity will be changed if value passed).
-    :param servings: New recipe servings. (Optional, model field servings will be changed if value passed).
-    :param categories: New recipe categories. (Optional, model field categories will be changed if value passed).
-    :param steps: New recipe steps. (Optional, model field steps will be changed if value passed).
-    :param ingredients: New recipe ingredients. (Optional, model field ingredients will be changed if value passed).
-    :param allowed_groups: List of user groups allowed to watch this recipe. (Optional, model field ingredients will be changed if value passed).
     :param session: SQLAlchemy AsyncSession object.
     :param current_user: User information object.
     :return: Response with status
     """
-    return await update_recipe_view(recipe_id=recipe_id,
-                                    title=title,
+    return await update_recipe_view(recipe_id=form.recipe_id,
+                                    title=form.title,
                                     image=image,
-                                    time=time,
-                                    complexity=complexity,
-                                    servings=servings,
-                                    categories=categories,
-                                    steps=steps,
-                                    ingredients=ingredients,
-                                    allowed_groups=allowed_groups,
+                                    time=form.time,
+                                    complexity=form.complexity,
+                                    servings=form.servings,
+                                    categories=form.categories,
+                                    steps=form.steps,
+                                    ingredients=form.ingredients,
+                                    allowed_groups=form.allowed_groups,
                                     session=session,
                                     current_user=current_user)
 
 
 @router.get("/categories", response_model=RecipeCategoriesResponseModel)
 async def get_recipes_categories(
+        request: Request,
         current_user: Optional[UserModel] = Depends(get_user_by_token_or_none),
-        session: AsyncSession = Depends(DatabaseManagerAsync.get_instance().get_session_object),
+        session: AsyncSession = Depends(get_session),
 ):
     """
     Route returns all recipe categories available in service.
 
+    :param request: Request object
     :param current_user: current user model
     :param session: SQLAlchemy AsyncSession object.
     :return: Response with available categories.
     """
-    return await get_recipes_categories_view(current_user=current_user, session=session)
+    etag, body = await get_recipes_categories_view(current_user=current_user, session=session)
+    return build_json_response_with_etag(request, etag, body)
 
 
 @router.post("/categories", response_model=DefaultResponse)
@@ -221,7 +228,7 @@ async def create_recipe_category(
         name: str = Form(...),
         image: Optional[UploadFile] = None,
         current_user: UserModel = Depends(get_admin_by_token),
-        session: AsyncSession = Depends(DatabaseManagerAsync.get_instance().get_session_object),
+        session: AsyncSession = Depends(get_session),
 ):
     """
     Route returns category info
@@ -236,19 +243,21 @@ async def create_recipe_category(
         category = await RecipeCategories.get_by_name(name=name, session=session)
         if category:
             raise HTTPException(status_code=409, detail="Такая категория уже существует")
-        category = await RecipeCategories.get_by_name_or_create(name=name, session=session)
+        # category with this name does not exist, so it is created without second lookup
+        category = RecipeCategories(name=name)
         if image:
             filename = build_full_path(f"{current_user.username}/categories/{name}", image)
             S3Manager.get_instance().send_image_shaped(image=image, base_filename=filename)
             category.image = filename
         session.add(category)
-        return DefaultResponse(detail="Категория добавлена")
+    clear_recipes_caches()
+    return DefaultResponse(detail="Категория добавлена")
 
 
 @router.get("/categories/{category_id}", response_model=RecipeCategoryResponseModel)
 async def get_recipe_category(
         category_id: int,
-        session: AsyncSession = Depends(DatabaseManagerAsync.get_instance().get_session_object),
+        session: AsyncSession = Depends(get_session),
 ):
     """
     Route returns category info
@@ -258,10 +267,10 @@ async def get_recipe_category(
     :return: Category info
     """
     async with session.begin():
-        category = await RecipeCategories.get_by_id(category_id=category_id, session=session)
-        category = category.__dict__
-        category["image"] = await get_category_image(category=category["name"], session=session)
-        return RecipeCategoryResponseModel(**category)
+        categories = await select_categories_with_images(session=session, category_id=category_id)
+        if not categories:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Категория не найдена")
+        return categories[0]
 
 
 @router.patch("/categories", response_model=DefaultResponse)
@@ -270,7 +279,7 @@ async def update_recipe_category(
         name: Optional[str] = Form(None),
         image: Optional[UploadFile] = Form(None),
         current_user: UserModel = Depends(get_admin_by_token),
-        session: AsyncSession = Depends(DatabaseManagerAsync.get_instance().get_session_object),
+        session: AsyncSession = Depends(get_session),
 ):
     """
     Route returns category info
@@ -287,51 +296,58 @@ async def update_recipe_category(
         if name:
             category.name = name
         if image:
-            filename = build_full_path(f"{current_user.username}/categories/{name}", image)
+            filename = build_full_path(f"{current_user.username}/categories/{category.name}", image)
             S3Manager.get_instance().send_image_shaped(image=image, base_filename=filename)
             category.image = filename
-        return DefaultResponse(detail="Рецепт обновлен")
+    clear_recipes_caches()
+    return DefaultResponse(detail="Рецепт обновлен")
 
 
 @router.delete("/categories/delete", response_model=DefaultResponse, dependencies=[Depends(get_admin_by_token)])
 async def delete_category(
         category_id: int = Form(...),
-        session: AsyncSession = Depends(DatabaseManagerAsync.get_instance().get_session_object)
+        session: AsyncSession = Depends(get_session)
 ):
     async with session.begin():
         await RecipeCategories.delete_by_id(category_id=category_id, session=session)
+    clear_recipes_caches()
     return DefaultResponse(detail="Категория удалена")
 
 
 @router.get("/compilations", response_model=RecipeCompilationsResponseModel)
 async def get_recipes_compilations(
-        session: AsyncSession = Depends(DatabaseManagerAsync.get_instance().get_session_object),
+        request: Request,
+        session: AsyncSession = Depends(get_session),
         current_user: Optional[UserModel] = Depends(get_user_by_token_or_none)
 ):
     """
     Route returns all recipe compilations.
     Description: Compilation is name for a bunch of grouped recipes by admin. Admin should name it and set an image.
 
+    :param request: Request object
     :param session: SQLAlchemy AsyncSession object.
     :return: Response with available compilations.
     """
-    return await get_recipes_compilations_view(session, current_user)
+    etag, body = await get_recipes_compilations_view(session, current_user)
+    return build_json_response_with_etag(request, etag, body)
 
 
 @router.get("/compilations/one/{compilation_id}", response_model=RecipeOneCompilationResponseModel)
-async def get_recipes_compilations(
+async def get_recipes_compilation(
         compilation_id: int,
-        session: AsyncSession = Depends(DatabaseManagerAsync.get_instance().get_session_object)
+        session: AsyncSession = Depends(get_session)
 ):
     """
-    Route returns all recipe compilations.
+    Route returns one recipe compilation with its recipes.
     Description: Compilation is name for a bunch of grouped recipes by admin. Admin should name it and set an image.
 
     :param compilation_id: id of compilation
     :param session: SQLAlchemy AsyncSession object.
-    :return: Response with available compilations.
+    :return: Response with compilation.
     """
-    return await get_one_compilation_view(session, compilation_id=compilation_id)
+    compilation = await get_one_compilation_view(session, compilation_id=compilation_id)
+    # compilation is already validated by view, so response is returned without second validation
+    return ORJSONResponse(compilation.dict())
 
 
 @router.post("/compilations", response_model=DefaultResponse)
@@ -340,7 +356,7 @@ async def create_recipes_compilation(
         image: UploadFile = Form(...),
         title: str = Form(...),
         current_user: UserModel = Depends(get_admin_by_token),
-        session: AsyncSession = Depends(DatabaseManagerAsync.get_instance().get_session_object),
+        session: AsyncSession = Depends(get_session),
 ):
     """
     Route for creating new compilation.
@@ -353,14 +369,13 @@ async def create_recipes_compilation(
     :param session: SQlAlchemy AsyncSession object.
     :return: List of available compilations.
     """
+    # form fields are already validated by FastAPI, so they are passed to view as is
     return await create_recipes_compilation_view(
-        current_user,
-        # Place form fields in a pydantic model
-        CreateCompilationRequestModel(
-            recipe_ids=recipe_ids,
-            image=image,
-            title=title),
-        session)
+        current_user=current_user,
+        recipe_ids=recipe_ids,
+        title=title,
+        image=image,
+        session=session)
 
 
 @router.patch("/compilations", response_model=DefaultResponse)
@@ -371,7 +386,7 @@ async def update_recipes_compilation(
         title: str = Form(...),
         position: int = Form(...),
         current_user: UserModel = Depends(get_admin_by_token),
-        session: AsyncSession = Depends(DatabaseManagerAsync.get_instance().get_session_object),
+        session: AsyncSession = Depends(get_session),
 ):
     """
     Route for updating existing compilation.
@@ -388,8 +403,9 @@ async def update_recipes_compilation(
     """
     return await update_recipes_compilation_view(
         current_user,
-        # Place form fields in a pydantic model
-        UpdateCompilationRequestModel(
+        # Place form fields in a pydantic model. Fields are already validated by FastAPI, so model is constructed
+        # without second validation
+        UpdateCompilationRequestModel.construct(
             compilation_id=compilation_id,
             recipe_ids=recipe_ids,
             image=image,
@@ -400,10 +416,10 @@ async def update_recipes_compilation(
 
 
 @router.delete("/compilations/del", response_model=DefaultResponse)
-async def create_recipes_compilation(
+async def delete_recipes_compilation(
         compilation_id: int,
         current_user: UserModel = Depends(get_admin_by_token),
-        session: AsyncSession = Depends(DatabaseManagerAsync.get_instance().get_session_object),
+        session: AsyncSession = Depends(get_session),
 ):
     """
     Route for deleting existing compilation.
@@ -425,7 +441,7 @@ async def create_recipes_compilation(
 async def toggle_recipe_like(
         recipe: RecipeLikesRequestModel,
         current_user: UserModel = Depends(get_user_by_token),
-        session: AsyncSession = Depends(DatabaseManagerAsync.get_instance().get_session_object)
+        session: AsyncSession = Depends(get_session)
 ):
     """
     Route that toggles recipe 'liked' state for user. First call will 'likes' recipe and this recipe will appear
@@ -441,22 +457,25 @@ async def toggle_recipe_like(
 
 @router.get("/utils/get_available_ingredients", response_model=GetIngredientsResponseModel)
 async def get_ingredients(
-        session: AsyncSession = Depends(DatabaseManagerAsync.get_instance().get_session_object)
+        request: Request,
+        session: AsyncSession = Depends(get_session)
 ):
     """
     Route will return names of all ingredients registered in this service.Check
     app.database.models.base -> RecipeIngredients for additional info.
 
+    :param request: Request object
     :param session: SQLAlchemy AsyncSession object.
     :return: Response with list of ingredients.
     """
-    return await get_ingredients_view(session)
+    etag, body = await get_ingredients_view(session)
+    return build_json_response_with_etag(request, etag, body)
 
 
 @router.delete("/utils/delete_ingredient")
 async def delete_ingredient(
         ingredient_id: int,
-        session: AsyncSession = Depends(DatabaseManagerAsync.get_instance().get_session_object)
+        session: AsyncSession = Depends(get_session)
 ):
     """
     Route will delete  ingredients registered in this service
@@ -470,57 +489,68 @@ async def delete_ingredient(
         return DefaultResponse(status_code=status.HTTP_404_NOT_FOUND, detail="Ингредиент не найден")
     await session.delete(ingredient)
     await session.commit()
+    clear_recipes_caches()
     return DefaultResponse(status_code=200, detail="Ингредиент удален")
 
 
 @router.get("/utils/get_available_ingredients_with_groups", response_model=GetIngredientsWithGroupsResponseModel)
 async def get_ingredients_with_groups(
-        session: AsyncSession = Depends(DatabaseManagerAsync.get_instance().get_session_object)
+        request: Request,
+        session: AsyncSession = Depends(get_session)
 ):
     """
     Route will return names of all ingredients registered in this service.Check
     app.database.models.base -> RecipeIngredients for additional info.
 
+    :param request: Request object
     :param session: SQLAlchemy AsyncSession object.
     :return: Response with list of ingredients.
     """
-    return await get_ingredients_with_groups_view(session)
+    etag, body = await get_ingredients_with_groups_view(session)
+    return build_json_response_with_etag(request, etag, body)
 
 
 @router.get("/utils/get_available_dimensions", response_model=GetDimensionsResponseModel)
 async def get_dimensions(
-        session: AsyncSession = Depends(DatabaseManagerAsync.get_instance().get_session_object)
+        request: Request,
+        session: AsyncSession = Depends(get_session)
 ):
     """
     Route will return of all dimensions registered in this service.
     Check app.database.models.base -> RecipeDimensions for additional info.
 
+    :param request: Request object
     :param session: SQLAlchemy AsyncSession object.
     :return: Response with list of ingredients.
     """
-    return await get_dimensions_view(session)
+    etag, body = await get_dimensions_view(session)
+    return build_json_response_with_etag(request, etag, body)
 
 
 @router.get("/utils/get_available_ingredients_groups", response_model=GetIngredientGroupsResponseModel)
 async def get_ingredients_groups(
-        session: AsyncSession = Depends(DatabaseManagerAsync.get_instance().get_session_object)
+        request: Request,
+        session: AsyncSession = Depends(get_session)
 ):
     """
     Route will return of all ingredient groups registered in this service.
     Check app.database.models.base -> IngredientsGroups for additional info.
 
+    :param request: Request object
     :param session: SQLAlchemy AsyncSession object.
     :return: Response with list of ingredients.
     """
-    return await get_ingredients_groups_view(session)
+    etag, body = await get_ingredients_groups_view(session)
+    return build_json_response_with_etag(request, etag, body)
 
 
 @router.get("/utils/find", response_model=FindResponseModel)
 async def find_all(
         string_to_find: str,
         max_returns: int = 5,
+        fuzzy: bool = False,
         current_user: Optional[UserModel] = Depends(get_user_by_token_or_none),
-        session: AsyncSession = Depends(DatabaseManagerAsync.get_instance().get_session_object)
+        session: AsyncSession = Depends(get_session)
 ):
     """
     Route will return result of search by string in models: Recipes, Ingredients and RecipeCategories.
@@ -528,51 +558,80 @@ async def find_all(
 
     :param string_to_find: String for search.
     :param max_returns: Maximum returned rows for each model.
+    :param fuzzy: If passed, also find rows similar to string (with typos), not only rows containing it.
     :param session: SQLAlchemy AsyncSession object.
     :param current_user: User information object.
     :return: Response with found objects for each model.
     """
-    return await find_all_view(
+    found = await find_all_view(
         string_to_find=string_to_find,
         max_returns=max_returns,
+        fuzzy=fuzzy,
         current_user=current_user,
         session=session,
     )
+    # found objects are already validated by view, so response is returned without second validation
+    return ORJSONResponse(found.dict())
 
 
 @router.get("/get_recipes_by_ingredient", response_model=GetRecipesResponseModel)
 async def get_recipes_by_ingredient(
+        request: Request,
         ingredient_name: str,
-        session: AsyncSession = Depends(DatabaseManagerAsync.get_instance().get_session_object),
+        session: AsyncSession = Depends(get_session),
         current_user: UserModel = Depends(get_user_by_token),
+        last_id: Union[int, None] = Query(default=None),
+        limit: int = Query(default=DEFAULT_RECIPES_PAGE_SIZE, gt=0, le=MAX_RECIPES_PAGE_SIZE),
 ):
     """
     Route will search recipes by ingredient name.
 
+    :param request: Request object
     :param ingredient_name: Name of a ingredient.
     :param session: SQLAlchemy AsyncSession object.
     :param current_user: User information object.
+    :param last_id: Id of the last recipe from previous page (keyset pagination)
+    :param limit: Page size (at most MAX_RECIPES_PAGE_SIZE). If not passed, DEFAULT_RECIPES_PAGE_SIZE is used
     :return: Found recipes.
     """
-    return await get_recipes_by_ingredient_view(
-        ingredient_name=ingredient_name,
-        session=session,
-        current_user=current_user
-    )
+    # only first page is cached
+    return await build_cached_recipes_list_response(
+        request,
+        user_id=current_user.id,
+        list_key=("ingredient", ingredient_name, limit) if last_id is None else None,
+        build_list=lambda: get_recipes_by_ingredient_view(
+            ingredient_name=ingredient_name,
+            session=session,
+            current_user=current_user,
+            last_id=last_id,
+            limit=limit,
+        ))
 
 
 @router.get("/get_recipes_by_category", response_model=GetRecipesResponseModel)
 async def get_recipes_by_category(
+        request: Request,
         category_name: str,
-        session: AsyncSession = Depends(DatabaseManagerAsync.get_instance().get_session_object),
+        session: AsyncSession = Depends(get_session),
         current_user: UserModel = Depends(get_user_by_token),
+        last_id: Union[int, None] = Query(default=None),
+        limit: int = Query(default=DEFAULT_RECIPES_PAGE_SIZE, gt=0, le=MAX_RECIPES_PAGE_SIZE),
 ):
     """
     Route will search recipes by category name.
 
+    :param request: Request object
     :param category_name: Name of a ingredient.
     :param session: SQLAlchemy AsyncSession object.
     :param current_user: User information object.
+    :param last_id: Id of the last recipe from previous page (keyset pagination)
+    :param limit: Page size (at most MAX_RECIPES_PAGE_SIZE). If not passed, DEFAULT_RECIPES_PAGE_SIZE is used
     :return: Found recipes.
     """
-    return await get_recipes_by_category_view(category_name=category_name, session=session, current_user=current_user)
+    # only first page is cached
+    return await build_cached_recipes_list_response(
+        request,
+        user_id=current_user.id,
+        list_key=("category", category_name, limit) if last_id is None else None,
+        build_list=lambda: get_recipes_by_category_view(
+            category_name=category_name, session=session, current_user=current_user, last_id=last_id, limit=limit))
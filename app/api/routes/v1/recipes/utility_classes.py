@@ -6,12 +6,6 @@ from fastapi import Form, UploadFile
 from pydantic import BaseModel
 
 
-class GetRecipesRequestModel(BaseModel):
-    """Model for recipe request by preferred ingredients and excluded ingredient groups"""
-    prefer_ingredients: Optional[List[str]]
-    exclude_groups: Optional[List[str]]
-
-
 class CreateRecipeIngredientRequestModel(BaseModel):
     """Model for ingredient creation"""
     name: str
@@ -26,29 +20,106 @@ class CreateRecipeStepRequestModel(BaseModel):
     content: str
 
 
-class CreateRecipeRequestModel(BaseModel):
-    """Model for recipe creation"""
-    title: str = Form()
+class CreateRecipeForm(BaseModel):
+    """Model for recipe creation multipart form"""
+    title: str
     """recipe title"""
-    time: int = Form()
+    time: int
     """cooking time"""
-    complexity: str = Form()
+    complexity: str
     """complexity (medium / hard / etc...)"""
-    servings: int = Form()
+    servings: int
     """servings"""
-    categories: List[str] = Form()
-    """recipe categories (dinner, snack, etc..)"""
-    steps: List[CreateRecipeStepRequestModel] = Form(...)
-    """recipe steps (each step as an object. Check CreateRecipeStepRequestModel)"""
-    ingredients: List[CreateRecipeIngredientRequestModel] = Form()
-    """recipe ingredients (each ingredient as an object. Check CreateRecipeIngredientRequestModel)"""
-
-
-class CreateCompilationRequestModel(BaseModel):
-    """Model for recipe compilation creation"""
-    recipe_ids: List[int]
-    title: str
-    image: Optional[UploadFile]
+    categories: str
+    """jsoned list of recipe categories (dinner, snack, etc..)"""
+    steps: str
+    """jsoned list of recipe steps (each step as an object. Check CreateRecipeStepRequestModel)"""
+    ingredients: str
+    """jsoned list of recipe ingredients (each ingredient as an object. Check CreateRecipeIngredientRequestModel)"""
+    allowed_groups: Optional[str]
+    """jsoned list of user groups allowed to watch this recipe"""
+
+    @classmethod
+    def as_form(
+            cls,
+            title: str = Form(),
+            time: int = Form(),
+            complexity: str = Form(),
+            servings: int = Form(),
+            categories: str = Form(),
+            steps: str = Form(),
+            ingredients: str = Form(),
+            allowed_groups: Optional[str] = Form(None),
+    ) -> 'CreateRecipeForm':
+        """
+        Method collects form fields to model. Should be used as FastAPI dependency. Fields are already
+        validated by FastAPI, so model is constructed without second validation.
+
+        :return: Form model
+        """
+        return cls.construct(
+            title=title,
+            time=time,
+            complexity=complexity,
+            servings=servings,
+            categories=categories,
+            steps=steps,
+            ingredients=ingredients,
+            allowed_groups=allowed_groups,
+        )
+
+
+class UpdateRecipeForm(BaseModel):
+    """Model for recipe update multipart form. Only passed fields will be changed"""
+    recipe_id: int
+    """id of recipe that should be updated"""
+    title: Optional[str]
+    """recipe title"""
+    time: Optional[int]
+    """cooking time"""
+    complexity: Optional[str]
+    """complexity (medium / hard / etc...)"""
+    servings: Optional[int]
+    """servings"""
+    categories: Optional[str]
+    """jsoned list of recipe categories (dinner, snack, etc..)"""
+    steps: Optional[str]
+    """jsoned list of recipe steps (each step as an object. Check CreateRecipeStepRequestModel)"""
+    ingredients: Optional[str]
+    """jsoned list of recipe ingredients (each ingredient as an object. Check CreateRecipeIngredientRequestModel)"""
+    allowed_groups: Optional[str]
+    """jsoned list of user groups allowed to watch this recipe"""
+
+    @classmethod
+    def as_form(
+            cls,
+            recipe_id: int = Form(None),
+            title: Optional[str] = Form(None),
+            time: Optional[int] = Form(None),
+            complexity: Optional[str] = Form(None),
+            servings: Optional[int] = Form(None),
+            categories: Optional[str] = Form(None),
+            steps: Optional[str] = Form(None),
+            ingredients: Optional[str] = Form(None),
+            allowed_groups: Optional[str] = Form(None),
+    ) -> 'UpdateRecipeForm':
+        """
+        Method collects form fields to model. Should be used as FastAPI dependency. Fields are already
+        validated by FastAPI, so model is constructed without second validation.
+
+        :return: Form model
+        """
+        return cls.construct(
+            recipe_id=recipe_id,
+            title=title,
+            time=time,
+            complexity=complexity,
+            servings=servings,
+            categories=categories,
+            steps=steps,
+            ingredients=ingredients,
+            allowed_groups=allowed_groups,
+        )
 
 
 class UpdateCompilationRequestModel(BaseModel):
@@ -81,6 +152,10 @@ class RecipeOneCompilationRecipe(BaseModel):
     id: int
     title: str
 
+    class Config:
+        """model is built directly from Recipes mapped object"""
+        orm_mode = True
+
 
 class RecipeOneCompilationResponseModel(BaseModel):
     compilation_id: int
@@ -131,11 +206,6 @@ class FindResponseModel(BaseModel):
     """found recipes where category names contains string"""
 
 
-class FindRequestModel(BaseModel):
-    """Model for request to search recipe with string"""
-    string_to_find: str
-
-
 class RecipeIngredientResponseModel(BaseModel):
     """Model for recipe ingredient response"""
     name: str
@@ -193,6 +263,8 @@ class GetRecipesRecipeResponseModel(BaseModel):
 class GetRecipesResponseModel(BaseModel):
     """Model for listed recipes response"""
     recipes: List[GetRecipesRecipeResponseModel]
+    # id to pass as 'last_id' for the next page request. None if there are no more recipes
+    next_last_id: Optional[int] = None
 
 
 class GetIngredientsResponseModel(BaseModel):
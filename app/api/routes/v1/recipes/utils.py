@@ -1,15 +1,19 @@
 """Utils for recipe views"""
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
+import orjson
 import sqlalchemy
 from fastapi import HTTPException, UploadFile
-from pydantic import ValidationError
-from sqlalchemy import select
+from pydantic import ValidationError, parse_obj_as
+from sqlalchemy import select, func, insert
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import selectinload, raiseload
+from sqlalchemy.orm.attributes import set_committed_value
 from starlette import status
 
-from app.api.routes.v1.groups.utils import get_group_model_or_create_if_not_exists
+from app.api.routes.v1.groups.utils import get_group_models_or_create_if_not_exist
 from app.api.routes.v1.utils.service_models import UserModel
 from app.api.routes.v1.utils.utility import build_full_path
 from app.constants import ADMIN_GROUP_NAME, PAYED_GROUP_NAME, NOT_AUTHENTICATED_GROUP_NAME
@@ -17,17 +21,38 @@ from app.utils import S3Manager
 from app.api.routes.v1.recipes.utility_classes import (
     CreateRecipeIngredientRequestModel,
     CreateRecipeStepRequestModel,
-    RecipeIngredientResponseModel,
-    GetRecipesRecipeResponseModel)
+    RecipeCategoryResponseModel)
 from app.database.models.base import (
     Ingredients,
     RecipeIngredients,
     Recipes,
     RecipeCategories,
     RecipeSteps,
-    Users,
     Groups,
-    RecipeCompilations)
+    RecipeCompilations,
+    RecipeDimensions,
+    IngredientsGroups,
+    association_recipes_categories,
+    association_recipes_groups,
+    association_recipes_likes)
+
+# relationships used by build_recipe_output. Each relationship is loaded explicitly, so nothing unused is selected.
+# Other recipe relationships (user, liked_by, compilations) raise on access instead of silent lazy load
+RECIPE_OUTPUT_LOAD_OPTIONS = (
+    selectinload(Recipes.steps),
+    selectinload(Recipes.categories),
+    selectinload(Recipes.allowed_groups),
+    selectinload(Recipes.ingredients).selectinload(RecipeIngredients.ingredient).selectinload(Ingredients.groups),
+    selectinload(Recipes.ingredients).selectinload(RecipeIngredients.dimension),
+    raiseload("*"),
+)
+# relationships modified by update_recipe
+RECIPE_UPDATE_LOAD_OPTIONS = (
+    selectinload(Recipes.ingredients),
+    selectinload(Recipes.steps),
+    selectinload(Recipes.categories),
+    selectinload(Recipes.allowed_groups),
+)
 
 
 async def create_or_update_recipe_ingredients(
@@ -44,12 +69,16 @@ async def create_or_update_recipe_ingredients(
     :param session: SQLAlchemy AsyncSession object.
     :return: None
     """
-    old_ingredients = recipe.ingredients
-    for ingredient in range(len(old_ingredients)):
-        old_ingredient = recipe.ingredients.pop()
-        await session.delete(old_ingredient)
-    for ingredient in new_ingredients:
-        new_ingredient = await RecipeIngredients.create(ingredient, session)
+    # old ingredients are deleted with one statement, then they are detached, so ORM will not try to delete them again
+    await session.execute(
+        sqlalchemy.delete(RecipeIngredients)
+        .where(RecipeIngredients.recipe_id == recipe.id)
+        .execution_options(synchronize_session=False)
+    )
+    for old_ingredient in recipe.ingredients:
+        session.expunge(old_ingredient)
+    set_committed_value(recipe, "ingredients", [])
+    for new_ingredient in await RecipeIngredients.create_many(new_ingredients, session):
         new_ingredient.recipe_id = recipe.id
         recipe.ingredients.append(new_ingredient)
 
@@ -69,10 +98,15 @@ async def update_recipe_steps(
     :return: None
     """
     new_steps = sorted(new_steps, key=lambda x: x.step_num)
-    # delete old steps
-    for step_num in range(len(recipe.steps)):
-        deleted_step = recipe.steps.pop()
-        await session.delete(deleted_step)
+    # delete old steps with one statement, then detach them, so ORM will not try to delete them again
+    await session.execute(
+        sqlalchemy.delete(RecipeSteps)
+        .where(RecipeSteps.recipe_id == recipe.id)
+        .execution_options(synchronize_session=False)
+    )
+    for old_step in recipe.steps:
+        session.expunge(old_step)
+    set_committed_value(recipe, "steps", [])
     # add new steps
     for step in new_steps:
         recipe.steps.append(RecipeSteps(step_num=step.step_num, content=step.content))
@@ -92,19 +126,15 @@ async def update_recipe_categories(
     :param session: SQLAlchemy AsyncSession object.
     :return: None
     """
-    current_categories = [i.name for i in recipe.categories]
-    categories_to_delete: List[str] = list(set(current_categories) - set(new_categories))
-    categories_to_add: List[str] = list(set(new_categories) - set(current_categories))
-    for category_num in range(len(categories_to_delete)):
-        recipe.categories.remove(
-            list(
-                filter(
-                    lambda x: x.name == categories_to_delete[category_num],
-                    recipe.categories)
-            )[0]
-        )
-    for new_category in categories_to_add:
-        recipe.categories.append(await RecipeCategories.get_by_name_or_create(name=new_category, session=session))
+    # current categories are indexed by name once, so diff is computed without scanning categories list
+    current_categories = {category.name: category for category in recipe.categories}
+    categories_to_delete = current_categories.keys() - set(new_categories)
+    categories_to_add = set(new_categories) - current_categories.keys()
+    category_models = await RecipeCategories.get_many_by_names_or_create(names=categories_to_add, session=session)
+    # collection is replaced once, ORM deletes and inserts changed association rows with one executemany each
+    recipe.categories = [
+        category for name, category in current_categories.items() if name not in categories_to_delete
+    ] + list(category_models.values())
 
 
 async def update_recipe_groups(
@@ -120,37 +150,114 @@ async def update_recipe_groups(
     :param session: SQLAlchemy AsyncSession object
     :return: None
     """
-    group_models: List[Groups] = []
-    for group in new_groups:
-        group_model = await get_group_model_or_create_if_not_exists(group, session)
-        if group_model:
-            group_models.append(group_model)
-    recipe.allowed_groups = group_models
+    group_models = await get_group_models_or_create_if_not_exist(new_groups, session)
+    recipe.allowed_groups = [group_models[group] for group in dict.fromkeys(new_groups)]
 
 
-async def get_recipe_by_id(recipe_id: int, session: AsyncSession) -> Recipes:
+def liked_by_user_column(user_id: Optional[int]):
     """
-    Method search recipe by passed id. If recipe not found, then it throws
-    404_NOT_FOUND exception
+    Method builds column that shows is recipe liked by user. Column is computed in sql, so users who liked
+    recipes are not loaded.
 
-    :param recipe_id: id of recipe.
-    :param session: SQLAlchemy AsyncSession object.
-    :return: Found recipe.
+    :param user_id: id of user or None for not authenticated user
+    :return: Labeled boolean column
     """
-    stmt = (
-        sqlalchemy.select(Recipes)
-        .where(Recipes.id == recipe_id)
-        .limit(1)
-        .options(selectinload("*"),)
+    if user_id is None:
+        return sqlalchemy.false().label("liked")
+    return (
+        sqlalchemy.exists()
+        .where(association_recipes_likes.c.recipe_id == Recipes.id)
+        .where(association_recipes_likes.c.user_id == user_id)
+        .label("liked")
+    )
+
+
+def allowed_groups_names_column():
+    """
+    Method builds column with array of recipe allowed groups names. Column is computed in sql, so groups are not
+    loaded as mapped objects.
+
+    :return: Labeled array column
+    """
+    groups_names = (
+        select(Groups.name)
+        .join(association_recipes_groups, association_recipes_groups.c.group_id == Groups.id)
+        .where(association_recipes_groups.c.recipe_id == Recipes.id)
+        .scalar_subquery()
+    )
+    return func.array(groups_names, type_=ARRAY(sqlalchemy.String)).label("allowed_groups_list")
+
+
+def recipes_list_columns(liked_column) -> tuple:
+    """
+    Method returns columns needed for listed recipes output.
+
+    :param liked_column: column labeled 'liked' that shows is recipe liked by user
+    :return: Tuple of columns
+    """
+    return (
+        Recipes.id,
+        Recipes.title,
+        Recipes.image,
+        Recipes.time,
+        Recipes.complexity,
+        Recipes.servings,
+        liked_column,
+        allowed_groups_names_column(),
     )
+
+
+async def get_recipe_by_id(
+        recipe_id: int,
+        session: AsyncSession,
+        user_id: Optional[int] = None,
+        user_group_ids: Optional[List[int]] = None,
+) -> Tuple[Recipes, bool]:
+    """
+    Method search recipe by passed id with all relationships needed for recipe output. If recipe not found,
+    then it throws 404_NOT_FOUND exception. If user_group_ids passed and none of them is allowed for recipe,
+    then it throws 401_UNAUTHORIZED exception
+
+    :param recipe_id: id of recipe.
+    :param session: SQLAlchemy AsyncSession object.
+    :param user_id: id of user who requests recipe, used for 'liked' field.
+    :param user_group_ids: If passed, ids of user groups. Only recipe allowed for one of these groups is selected.
+    :return: Found recipe and is it liked by user.
+    """
+    # statement is built with lambdas, so it's constructed once per shape (with or without user) and then only
+    # recipe_id and user_id are bound from closures. 'liked' column is the same as liked_by_user_column, but
+    # written inline, because user_id should be referenced directly in lambda to be tracked as parameter
+    if user_id is None:
+        stmt = sqlalchemy.lambda_stmt(lambda: select(Recipes, sqlalchemy.false().label("liked")))
+    else:
+        stmt = sqlalchemy.lambda_stmt(lambda: select(
+            Recipes,
+            sqlalchemy.exists()
+            .where(association_recipes_likes.c.recipe_id == Recipes.id)
+            .where(association_recipes_likes.c.user_id == user_id)
+            .label("liked")
+        ))
+    stmt += lambda s: s.where(Recipes.id == recipe_id).limit(1).options(*RECIPE_OUTPUT_LOAD_OPTIONS)
+    if user_group_ids is not None:
+        # access is checked in sql, so relationships of not allowed recipe are not loaded. Groups are checked
+        # by ids in association table, so groups table is not joined
+        stmt += lambda s: s.where(
+            sqlalchemy.exists()
+            .where(association_recipes_groups.c.recipe_id == Recipes.id)
+            .where(association_recipes_groups.c.group_id.in_(user_group_ids))
+        )
     resp = await session.execute(stmt)
-    recipe: Recipes = resp.scalars().first()
-    if not recipe:
+    row = resp.first()
+    if not row:
+        # recipe existence is checked only on this rare path to choose between 404 and 401
+        if user_group_ids is not None and await session.scalar(select(Recipes.id).where(Recipes.id == recipe_id)):
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
+                                detail="У вас нет досутпа к этому рецепту")
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Рецепт не найден")
-    return recipe
+    return row.Recipes, row.liked
 
 
-async def check_is_user_allow_to_modify_recipe(recipe: Recipes, current_user: UserModel, session: AsyncSession):
+def check_is_user_allow_to_modify_recipe(recipe: Recipes, current_user: UserModel):
     """
     Method checks is user allowed to modify recipe. Allowed if this user is admin or it user created recipe.
     If user allowed, then method will work silently, else if user not allowed, then it throws
@@ -160,40 +267,63 @@ async def check_is_user_allow_to_modify_recipe(recipe: Recipes, current_user: Us
     :param current_user: User information object.
     :return: None
     """
-    recipe_created_by_this_user = recipe.user.id == current_user.id
-    user: Users = await Users.get_by_id(user_id=current_user.id, session=session, join_tables=[Users.groups])
-    user_is_admin = ADMIN_GROUP_NAME in [group.name for group in user.groups]
-    # if user is not admin and try to delete recipe that was added by other user, then we should throw 401
-    if not recipe_created_by_this_user and not user_is_admin:
+    # author is checked by foreign key and admin by groups of authenticated user, so nothing is loaded from database
+    if not (recipe.user_id == current_user.id or current_user.is_admin):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="У вас нет прав на удаление рецепта")
 
 
+async def delete_recipe(recipe_id: int, current_user: UserModel, session: AsyncSession) -> None:
+    """
+    Method deletes recipe with one statement. Allowed if this user is admin or it user created recipe, so
+    rights are checked by the same statement. If recipe not found, then it throws 404_NOT_FOUND exception, if
+    user not allowed, then it throws 401_UNAUTHORIZED exception. Related rows are deleted by database cascades.
+
+    :param recipe_id: id of recipe that should be deleted
+    :param current_user: User information object.
+    :param session: SQLAlchemy AsyncSession object
+    :return: None
+    """
+    # core statement over recipes table, recipe objects are not loaded to session
+    recipes_table = Recipes.__table__
+    stmt = sqlalchemy.delete(recipes_table).where(recipes_table.c.id == recipe_id)
+    if not current_user.is_admin:
+        stmt = stmt.where(recipes_table.c.user_id == current_user.id)
+    deleted_id = await session.scalar(stmt.returning(recipes_table.c.id))
+    if deleted_id is None:
+        # recipe existence is checked only on this rare path to choose between 404 and 401
+        if await session.scalar(select(Recipes.id).where(Recipes.id == recipe_id)):
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="У вас нет прав на удаление рецепта")
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Рецепт не найден")
+
+
 async def select_recipes_and_filter_them(
         session: AsyncSession,
         user_groups: list[str],
+        limit: int,
         include_categories: Optional[list[str]] = None,
         prefer_ingredients: Optional[list[str]] = None,
         compilation: Optional[list[str]] = None,
-        exclude_groups: Optional[list[str]] = None
-) -> List[Recipes]:
+        exclude_groups: Optional[list[str]] = None,
+        last_id: Optional[int] = None,
+        user_id: Optional[int] = None,
+) -> List[Row]:
     """
-    Method selects all recipes with filters.
+    Method selects page of recipes with filters. Each row contains recipe and 'liked' flag.
 
     :param session: SQLAlchemy AsyncSession object
     :param user_groups: Requested user groups. Method filters recipes where user groups intersect with
     recipe allowed groups
+    :param limit: Max count of selected recipes. Recipes are ordered by id descending
     :param include_categories: If passed, filter recipes where categories intersect with these
     :param prefer_ingredients: If passed, filter recipes where ingredients intersect with these
     :param compilation: If passed, filter recipes that selected for this compilation
     :param exclude_groups: If passed, filter recipes where groups do not intersect with these
-    :return:
+    :param last_id: If passed, select only recipes with id lower than this one (keyset pagination)
+    :param user_id: id of requested user, used for 'liked' field
+    :return: rows with listed recipe columns (check recipes_list_columns)
     """
-    # First make base query
-    stmt = (
-        select(Recipes)
-        .options(selectinload(Recipes.allowed_groups))
-        .options(selectinload(Recipes.liked_by))
-    )
+    # First make base query. Only columns needed for output are selected, so recipes are not mapped to objects
+    stmt = select(*recipes_list_columns(liked_by_user_column(user_id)))
     if PAYED_GROUP_NAME not in user_groups and ADMIN_GROUP_NAME not in user_groups:
         stmt = stmt.filter(Recipes.allowed_groups.any(Groups.name.notlike(PAYED_GROUP_NAME)))
         pass
@@ -203,110 +333,151 @@ async def select_recipes_and_filter_them(
 
     # If include_categories passed, then filter recipes where categories intersect at least with one of these
     if include_categories:
-        stmt = stmt.options(selectinload(Recipes.categories))
         stmt = stmt.filter(Recipes.categories.any(RecipeCategories.name.in_(include_categories)))
 
-    if prefer_ingredients or exclude_groups:
-        # this two filters refers to one table - RecipeIngredients, so we need join it when one of these passed
-        stmt = stmt.join(RecipeIngredients).join(Ingredients)
-        # if prefer_ingredients passed, then we should filter recipes where prefer_ingredients intersect with at least
-        # one ingredient name
-        if prefer_ingredients:
-            stmt = stmt.filter(Ingredients.name.in_(prefer_ingredients))
-
-        # if exclude_groups passed, then we should filter recipes where groups do not intersect with any of
-        # excluded groups
-        # if exclude_groups:  # TODO: not working at this time, need to fix it.
-        #     stmt = stmt.join(association_ingredients_groups).join(IngredientsGroups)
-        #     stmt = stmt.filter(IngredientsGroups.name.notin_(exclude_groups))
+    # if prefer_ingredients passed, then we should filter recipes where prefer_ingredients intersect with at least
+    # one ingredient name. EXISTS is used instead of join, so recipe with several such ingredients
+    # is selected once and postgres can check it by (recipe_id, ingredient_id) index
+    if prefer_ingredients:
+        stmt = stmt.filter(Recipes.ingredients.any(RecipeIngredients.ingredient_id.in_(
+            select(Ingredients.id).where(Ingredients.name.in_(prefer_ingredients)).scalar_subquery()
+        )))
+
+    # if exclude_groups passed, then we should filter recipes where ingredients groups do not intersect with any of
+    # excluded groups. It's NOT EXISTS in sql, so ingredients and their groups are not loaded
+    if exclude_groups:
+        stmt = stmt.filter(~Recipes.ingredients.any(RecipeIngredients.ingredient.has(
+            Ingredients.groups.any(IngredientsGroups.name.in_(exclude_groups))
+        )))
     # if compilation passed, then we should select recipes that selected for this compilation
     if compilation:
-        stmt = stmt.options(selectinload(Recipes.compilations))
         stmt = stmt.filter(Recipes.compilations.any(RecipeCompilations.name.in_([compilation])))
-    response = await session.execute(stmt)
-    recipes: List[Recipes] = response.scalars().all()
-    return recipes
+    # keyset pagination: client passes id of the last recipe from previous page, so the next page is
+    # an index range scan instead of skipping offset rows
+    if last_id is not None:
+        stmt = stmt.where(Recipes.id < last_id)
+    response = await session.execute(stmt.order_by(Recipes.id.desc()).limit(limit))
+    return response.all()
 
 
-def build_recipes_output(recipes: list[Recipes], current_user: Optional[UserModel]) -> List[GetRecipesRecipeResponseModel]:
+def build_recipes_output(recipes: List[Row], user_groups: Optional[List[str]]) -> List[dict]:
     """
-    Method build list of recipes to output format. Add links to images and liked fields.
-    Description: recipe 'liked' if user who request this recipe is liked it.
+    Method build list of recipes to output format. Add links to images and allowed fields.
+    Output dicts have GetRecipesRecipeResponseModel shape, but are not validated, because shape is guaranteed
+    by selected columns.
 
-    :param recipes: List of recipes.
-    :param current_user: User information object
+    :param recipes: List of rows with listed recipe columns (check recipes_list_columns).
+    :param user_groups: Names of requested user groups or None for not authenticated user
     :return: List of formatted recipes
     """
-    user_groups = current_user.groups if current_user else None
-    user_groups_names = [NOT_AUTHENTICATED_GROUP_NAME]
-    if user_groups:
-        user_groups_names = [group.name for group in user_groups]
-    if ADMIN_GROUP_NAME not in user_groups_names:
-        recipes = list(filter(lambda x: x.image is not None, recipes))
-
-    if PAYED_GROUP_NAME not in user_groups_names or ADMIN_GROUP_NAME not in user_groups_names:
-        recipes = list(filter(lambda x: PAYED_GROUP_NAME not in x.allowed_groups, recipes))
-
-    recipes_to_return = []
-    for recipe in recipes:
-        recipe_dicted = recipe.__dict__
-        if recipe.image:
-            image = S3Manager.get_instance().get_url(f"{recipe.image}_small.jpg")
-        else:
-            image = None
-        recipe_dicted["image"] = image
-        recipe_dicted["liked"] = current_user in recipe.liked_by if current_user else False
-        recipe_dicted["allowed"] = True if any((True for user_group in (current_user.groups if current_user else ["no_auth"]) if (user_group.name if user_group is not "no_auth" else "no_auth") in [group.name for group in recipe.allowed_groups])) else False
-        recipe_dicted["allowed_groups_list"] = [group.name for group in recipe.allowed_groups]
-        recipes_to_return.append(GetRecipesRecipeResponseModel(**recipe_dicted))
-    return sorted(recipes_to_return, key=lambda x: x.allowed, reverse=True)
+    # recipes without images are already filtered in sql for non admin users
+    user_groups_names = frozenset(user_groups or [NOT_AUTHENTICATED_GROUP_NAME])
+    images = S3Manager.get_instance().get_urls(
+        f"{recipe.image}_small.jpg" if recipe.image else None for recipe in recipes)
+    # recipes keep selected order (id descending), so the last recipe of page is a cursor for the next page
+    return [
+        {
+            "id": recipe.id,
+            "title": recipe.title,
+            "image": image,
+            "time": recipe.time,
+            "complexity": recipe.complexity,
+            "servings": recipe.servings,
+            "liked": recipe.liked,
+            "allowed": not user_groups_names.isdisjoint(recipe.allowed_groups_list),
+            "allowed_groups_list": recipe.allowed_groups_list,
+        }
+        for recipe, image in zip(recipes, images)
+    ]
+
+
+def build_recipes_page(recipes: List[Row], user_groups: Optional[List[str]], limit: int) -> dict:
+    """
+    Method build page of recipes in GetRecipesResponseModel shape. If page is full, then there can be more recipes,
+    so id of the last recipe is returned as 'next_last_id' cursor for the next page request.
+
+    :param recipes: List of rows with listed recipe columns (check recipes_list_columns), ordered by id descending.
+    :param user_groups: Names of requested user groups or None for not authenticated user
+    :param limit: Requested page size
+    :return: Page of formatted recipes
+    """
+    if not recipes:
+        return {"recipes": [], "next_last_id": None}
+    return {
+        "recipes": build_recipes_output(recipes=recipes, user_groups=user_groups),
+        "next_last_id": recipes[-1].id if len(recipes) == limit else None,
+    }
 
 
 async def select_liked_recipes(
         session: AsyncSession,
-        current_user: UserModel
-) -> List[Recipes]:
+        current_user: UserModel,
+        limit: int,
+        last_id: Optional[int] = None,
+) -> List[Row]:
     """
-    Method selects all recipes what was liked by user.
+    Method selects page of recipes what was liked by user.
 
     :param session: SQLAlchemy AsyncSession
     :param current_user: User information object
-    :return: recipes list
+    :param limit: Max count of selected recipes. Recipes are ordered by id descending
+    :param last_id: If passed, select only recipes with id lower than this one (keyset pagination)
+    :return: rows with listed recipe columns (check recipes_list_columns)
     """
     stmt = (
-        select(Recipes)
+        # all selected recipes are liked, so there is no need to check it in sql
+        select(*recipes_list_columns(sqlalchemy.true().label("liked")))
         .where(Recipes.user_id == 1, Recipes.image.isnot(None))  # some recipes do not have images, so filter them
-        .filter(Recipes.allowed_groups.any(Groups.name.in_([group for group in current_user.groups])))
-        .options(selectinload('*'))
+        # groups are checked by ids in association table, so groups table is not joined
+        .where(
+            sqlalchemy.exists()
+            .where(association_recipes_groups.c.recipe_id == Recipes.id)
+            .where(association_recipes_groups.c.group_id.in_(current_user.group_ids))
+        )
     )
-    stmt = stmt.filter(Recipes.liked_by.any(Users.id.in_([current_user.id])))
-    response = await session.execute(stmt)
-    recipes: List[Recipes] = response.scalars().all()
-    return recipes
+    stmt = stmt.where(
+        sqlalchemy.exists()
+        .where(association_recipes_likes.c.recipe_id == Recipes.id)
+        .where(association_recipes_likes.c.user_id == current_user.id)
+    )
+    if last_id is not None:
+        stmt = stmt.where(Recipes.id < last_id)
+    response = await session.execute(stmt.order_by(Recipes.id.desc()).limit(limit))
+    return response.all()
 
 
-def build_recipe_output(recipe: Recipes, current_user: UserModel) -> dict:
+def build_recipe_output(recipe: Recipes, liked: bool) -> dict:
     """
     Method build recipe to output format. Add links to images and liked fields.
     Description: recipe 'liked' if user who request this recipe is liked it.
+    Output dict has RecipeResponseModel shape. Fields are taken explicitly from recipe attributes, so
+    sqlalchemy instance state is not copied and output is not validated second time.
 
     :param recipe: recipe.
-    :param current_user: User information object
+    :param liked: is recipe liked by user who requested it
     :return: Formatted recipe
     """
-    recipe_response = dict(recipe.__dict__)
-    recipe_response["ingredients"] = [
-        RecipeIngredientResponseModel(name=i.ingredient.name, value=i.value, dimension=i.dimension.name, groups=[j.name for j in i.ingredient.groups]) for i
-        in
-        recipe_response["ingredients"]]
-    recipe_response["steps"] = [i.content for i in
-                                list(sorted(recipe_response["steps"], key=lambda x: x.step_num))]
-    recipe_response["categories"] = [i.name for i in recipe_response["categories"]]
-    recipe_response["image"] = None if recipe_response["image"] is None else S3Manager.get_instance().get_url(
-        f"{recipe_response['image']}_med.jpg")
-    recipe_response["allowed_groups"] = [group.name for group in recipe_response["allowed_groups"]]
-    recipe_response["liked"] = current_user.username in [user.username for user in recipe.liked_by] if current_user else False
-    return recipe_response
+    return {
+        "id": recipe.id,
+        "title": recipe.title,
+        "image": None if recipe.image is None else S3Manager.get_instance().get_url(f"{recipe.image}_med.jpg"),
+        "time": recipe.time,
+        "complexity": recipe.complexity,
+        "ingredients": [
+            {
+                "name": recipe_ingredient.ingredient.name,
+                "value": recipe_ingredient.value,
+                "dimension": recipe_ingredient.dimension.name,
+                "groups": [group.name for group in recipe_ingredient.ingredient.groups],
+            }
+            for recipe_ingredient in recipe.ingredients
+        ],
+        "steps": [step.content for step in sorted(recipe.steps, key=lambda x: x.step_num)],
+        "categories": [category.name for category in recipe.categories],
+        "servings": recipe.servings,
+        "liked": liked,
+        "allowed_groups": [group.name for group in recipe.allowed_groups],
+    }
 
 
 async def create_new_recipe(
@@ -341,28 +512,56 @@ async def create_new_recipe(
     # creates default recipe without additional data
     new_recipe: Recipes = Recipes(title=title, time=time, complexity=complexity, servings=servings,
                                   user_id=current_user.id)
-    # adding ingredients to recipe. if ingredient don't exist, first create new ingredient
-    for ingredient in ingredients:
-        new_recipe.ingredients.append(await RecipeIngredients.create(ingredient, session))
-    # adding cooking steps to recipe.
-    for step in steps:
-        new_recipe.steps.append(RecipeSteps(step_num=step.step_num, content=step.content))
-    # adding categories to recipe. if ingredient don't exist, first create new ingredient
-    for category in categories:
-        new_recipe.categories.append(await RecipeCategories.get_by_name_or_create(category, session))
+    # first resolve ingredients, dimensions, categories and groups with one query for each.
+    # If some of them don't exist, they are created. Autoflush is disabled, so rows created by
+    # previous lookups are not flushed before each next SELECT, everything is flushed once below
+    with session.no_autoflush:
+        ingredient_models = await Ingredients.get_many_by_names_or_create(ingredients, session)
+        dimension_models = await RecipeDimensions.get_many_by_names_or_create(
+            (ingredient.dimension for ingredient in ingredients), session)
+        category_models = list((await RecipeCategories.get_many_by_names_or_create(categories, session)).values())
+        group_models = list((await get_group_models_or_create_if_not_exist(allowed_groups or [], session)).values())
+    recipe_ingredients = [
+        (ingredient_models[ingredient.name], dimension_models[ingredient.dimension], ingredient.weight)
+        for ingredient in ingredients
+    ]
 
-    if allowed_groups:
-        group_models = []
-        for group in allowed_groups:
-            group_models.append(await get_group_model_or_create_if_not_exists(group, session))
-        new_recipe.allowed_groups = group_models
-
-    if image:
-        filename = build_full_path(f"{current_user.username}/recipes/{new_recipe.title}", image)
-        S3Manager.get_instance().send_image_shaped(image=image, base_filename=filename)
-        new_recipe.image = filename
     session.add(new_recipe)
+    if image:
+        new_recipe.image = build_full_path(f"{current_user.username}/recipes/{new_recipe.title}", image)
+    # single flush of recipe and all new related rows to get their ids
     await session.flush()
+
+    # child rows are inserted with one executemany statement per table
+    if recipe_ingredients:
+        await session.execute(insert(RecipeIngredients), [
+            {
+                "recipe_id": new_recipe.id,
+                "ingredient_id": ingredient.id,
+                "dimension_id": dimension.id,
+                "value": value,
+            }
+            for ingredient, dimension, value in recipe_ingredients
+        ])
+    if steps:
+        await session.execute(insert(RecipeSteps), [
+            {"recipe_id": new_recipe.id, "step_num": step.step_num, "content": step.content}
+            for step in steps
+        ])
+    if category_models:
+        await session.execute(insert(association_recipes_categories), [
+            {"recipe_id": new_recipe.id, "category_id": category.id}
+            for category in category_models
+        ])
+    if group_models:
+        await session.execute(insert(association_recipes_groups), [
+            {"recipe_id": new_recipe.id, "group_id": group.id}
+            for group in group_models
+        ])
+    if image:
+        # image is uploaded only after recipe and all its rows are written, so failed insert does not leave
+        # orphaned image in s3. Upload error rolls back the transaction
+        await S3Manager.get_instance().send_image_shaped_async(image=image, base_filename=new_recipe.image)
     return new_recipe.id
 
 
@@ -398,13 +597,11 @@ async def update_recipe(
     :param current_user: User information object.
     :return: None
     """
-    await check_is_user_allow_to_modify_recipe(recipe=recipe, current_user=current_user, session=session)
+    check_is_user_allow_to_modify_recipe(recipe=recipe, current_user=current_user)
     if title:
         recipe.title = title
     if image:
-        filename = build_full_path(f"{current_user.username}/recipes/{recipe.title}", image)
-        S3Manager.get_instance().send_image_shaped(image=image, base_filename=filename)
-        recipe.image = filename
+        recipe.image = build_full_path(f"{current_user.username}/recipes/{recipe.title}", image)
     if time:
         recipe.time = time
     if complexity:
@@ -425,34 +622,58 @@ async def update_recipe(
         await update_recipe_categories(new_categories=categories, recipe=recipe, session=session)
 
     if allowed_groups:
-        allowed_groups = eval(allowed_groups)
+        allowed_groups = parse_groups_to_list(allowed_groups)
         await update_recipe_groups(allowed_groups, recipe=recipe, session=session)
 
+    if image:
+        # image is uploaded only after recipe changes are flushed successfully. Upload is not run together with
+        # flush, so failed upload does not roll back the transaction while flush is still running on the session
+        await session.flush()
+        await S3Manager.get_instance().send_image_shaped_async(image=image, base_filename=recipe.image)
+
 
-async def get_category_image(category: str, session: AsyncSession) -> Optional[str]:
+def category_image_column():
     """
-    Method returns image of first recipe in category that has image.
+    Method builds column with category image path. If category has own image, then it is used, else
+    image of first recipe with image in this category. Subquery is correlated to the outer categories query,
+    so categories and their images are selected in one round-trip.
 
-    :param category: category name
-    :param session: SQLALchemy AsyncSession object
-    :return: Category image if any recipe with image found, else None
+    :return: Labeled column with image path
     """
-    stmt = (
-        sqlalchemy.select(RecipeCategories)
-        .where(RecipeCategories.name == category)
+    first_recipe_image = (
+        select(Recipes.image)
+        .join(association_recipes_categories, association_recipes_categories.c.recipe_id == Recipes.id)
+        .where(association_recipes_categories.c.category_id == RecipeCategories.id, Recipes.image.isnot(None))
+        .order_by(Recipes.id)
         .limit(1)
-        .options(selectinload(RecipeCategories.recipes))
+        .scalar_subquery()
     )
-    resp = await session.execute(stmt)
-    category: RecipeCategories = resp.scalars().first()
-    if not category:
-        raise HTTPException(status_code=404, detail="Категория не найдена")
-    if category.image:
-        return S3Manager.get_instance().get_url(f"{category.image}_small.jpg")
-    for recipe in category.recipes:
-        if recipe.image:
-            return S3Manager.get_instance().get_url(f"{recipe.image}_small.jpg")
-    return None
+    return func.coalesce(RecipeCategories.image, first_recipe_image).label("image")
+
+
+async def select_categories_with_images(
+        session: AsyncSession,
+        category_id: Optional[int] = None
+) -> List[RecipeCategoryResponseModel]:
+    """
+    Method selects categories with links to their images.
+
+    :param session: SQLAlchemy AsyncSession object
+    :param category_id: If passed, select only category with this id
+    :return: Categories list
+    """
+    stmt = select(RecipeCategories.id, RecipeCategories.name, category_image_column())
+    if category_id is not None:
+        stmt = stmt.where(RecipeCategories.id == category_id)
+    response = await session.execute(stmt)
+    return [
+        RecipeCategoryResponseModel(
+            id=row.id,
+            name=row.name,
+            image=S3Manager.get_instance().get_url(f"{row.image}_small.jpg") if row.image else None
+        )
+        for row in response
+    ]
 
 
 def parse_ingredients_to_pydantic_models(ingredients: str) -> List[CreateRecipeIngredientRequestModel]:
@@ -463,9 +684,8 @@ def parse_ingredients_to_pydantic_models(ingredients: str) -> List[CreateRecipeI
     :return: Parsed ingredients.
     """
     try:
-        ingredients = [CreateRecipeIngredientRequestModel(**i) for i in eval(ingredients)]
-        return ingredients
-    except ValidationError:
+        return parse_obj_as(List[CreateRecipeIngredientRequestModel], orjson.loads(ingredients))
+    except (orjson.JSONDecodeError, ValidationError):
         raise HTTPException(status_code=422, detail="Ошибка в добавлении. "
                                                     "Проверьте правильность введенных ингридиентов")
 
@@ -478,9 +698,8 @@ def parse_steps_to_pydantic_models(steps: str) -> List[CreateRecipeStepRequestMo
     :return: Parsed ingredients.
     """
     try:
-        steps = [CreateRecipeStepRequestModel(**i) for i in eval(steps)]
-        return steps
-    except ValidationError:
+        return parse_obj_as(List[CreateRecipeStepRequestModel], orjson.loads(steps))
+    except (orjson.JSONDecodeError, ValidationError):
         raise HTTPException(status_code=422, detail="Ошибка в добавлении. "
                                                     "Проверьте правильность введенных шагов")
 
@@ -492,5 +711,22 @@ def parse_categories_to_list(categories: str) -> List[str]:
     :param categories: Jsoned list of categories.
     :return: Parsed ingredients.
     """
-    categories = eval(categories)
-    return categories
+    try:
+        return parse_obj_as(List[str], orjson.loads(categories))
+    except (orjson.JSONDecodeError, ValidationError):
+        raise HTTPException(status_code=422, detail="Ошибка в добавлении. "
+                                                    "Проверьте правильность введенных категорий")
+
+
+def parse_groups_to_list(groups: str) -> List[str]:
+    """
+    Parses jsoned list of user groups names to python list.
+
+    :param groups: Jsoned list of groups names.
+    :return: Parsed groups names.
+    """
+    try:
+        return parse_obj_as(List[str], orjson.loads(groups))
+    except (orjson.JSONDecodeError, ValidationError):
+        raise HTTPException(status_code=422, detail="Ошибка в добавлении. "
+                                                    "Проверьте правильность введенных групп")
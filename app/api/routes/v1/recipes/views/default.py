@@ -1,24 +1,22 @@
 """Default views for recipes routes"""
 from typing import List, Optional
 
-from fastapi import HTTPException, UploadFile
+from fastapi import UploadFile
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from starlette import status
 
-from app.api.routes.default_response_models import DefaultResponse, DefaultResponseWithPayload
+from app.api.routes.v1.recipes.cache import clear_recipes_caches
 from app.api.routes.v1.recipes.utility_classes import (
     CreateRecipeIngredientRequestModel,
-    CreateRecipeStepRequestModel,
-    GetRecipesResponseModel,
-    RecipeResponseModel)
+    CreateRecipeStepRequestModel)
 from app.api.routes.v1.recipes.utils import (
     parse_ingredients_to_pydantic_models, parse_steps_to_pydantic_models,
-    parse_categories_to_list, select_recipes_and_filter_them,
-    build_recipes_output, build_recipe_output, check_is_user_allow_to_modify_recipe,
-    create_new_recipe, update_recipe, select_liked_recipes)
+    parse_categories_to_list, parse_groups_to_list, select_recipes_and_filter_them,
+    build_recipes_page, build_recipe_output, delete_recipe,
+    create_new_recipe, update_recipe, select_liked_recipes, get_recipe_by_id, RECIPE_UPDATE_LOAD_OPTIONS)
 from app.api.routes.v1.utils.service_models import UserModel
-from app.constants import ADMIN_GROUP_NAME, NOT_AUTHENTICATED_GROUP_NAME
-from app.database.models.base import Users, Recipes
+from app.constants import NOT_AUTHENTICATED_GROUP_NAME
+from app.database.models.base import Recipes
 
 
 async def get_recipes_view(
@@ -28,7 +26,9 @@ async def get_recipes_view(
         compilation: Optional[str],
         session: AsyncSession,
         current_user: Optional[UserModel],
-) -> GetRecipesResponseModel:
+        last_id: Optional[int],
+        limit: int,
+) -> dict:
     """
     View for recipes request
 
@@ -38,7 +38,9 @@ async def get_recipes_view(
     :param exclude_groups: exclude recipe with this groups
     :param include_categories: exclude recipes that don't have these ingredients
     :param compilation: exclude recipes that not in this compilation
-    :return: found recipes list
+    :param last_id: id of the last recipe from previous page
+    :param limit: page size
+    :return: found recipes list in GetRecipesResponseModel shape
     """
     async with session.begin():
         # get recipes with selected filters
@@ -48,93 +50,101 @@ async def get_recipes_view(
             include_categories=include_categories,
             prefer_ingredients=prefer_ingredients,
             compilation=compilation,
-            exclude_groups=exclude_groups
+            exclude_groups=exclude_groups,
+            last_id=last_id,
+            limit=limit,
+            user_id=current_user.id if current_user else None,
         )
-        if not recipes:
-            return GetRecipesResponseModel(recipes=[])
-        # now for each recipe we should make image link and add 'liked' field (it's liked by request user)
-        current_user: Users = await Users.get_by_id(user_id=current_user.id, session=session, join_tables=[Users.groups]) if current_user else None
-        return GetRecipesResponseModel(recipes=build_recipes_output(recipes=recipes, current_user=current_user))
+        # now for each recipe we should make image link and add 'allowed' field by request user groups
+        return build_recipes_page(
+            recipes=recipes, user_groups=current_user.groups if current_user else None, limit=limit)
 
 
 async def get_recipes_by_ingredient_view(
         ingredient_name: str,
         session: AsyncSession,
         current_user: UserModel,
-) -> GetRecipesResponseModel:
+        last_id: Optional[int],
+        limit: int,
+) -> dict:
     """
     View for recipes search by ingredient
 
     :param ingredient_name: name of ingredient
     :param session: SQLAlchemy AsyncSession object
     :param current_user: User information object
-    :return: found recipes list
+    :param last_id: id of the last recipe from previous page
+    :param limit: page size
+    :return: found recipes list in GetRecipesResponseModel shape
     """
     # get recipes with selected filters
-    recipes = await Recipes.get_all_with_ingredients(
+    recipes = await select_recipes_and_filter_them(
         session=session,
         user_groups=current_user.groups,
         prefer_ingredients=[ingredient_name],
+        last_id=last_id,
+        limit=limit,
+        user_id=current_user.id,
     )
-    if not recipes:
-        return GetRecipesResponseModel(recipes=[])
-    # now for each recipe we should make image link and add 'liked' field (it's liked by request user)
-    current_user: Users = await Users.get_by_id(user_id=current_user.id, session=session)
-    return GetRecipesResponseModel(recipes=build_recipes_output(recipes=recipes, current_user=current_user))
+    # now for each recipe we should make image link and add 'allowed' field by request user groups
+    return build_recipes_page(recipes=recipes, user_groups=current_user.groups, limit=limit)
 
 
 async def get_recipes_by_category_view(
         category_name: str,
         session: AsyncSession,
         current_user: UserModel,
-) -> GetRecipesResponseModel:
+        last_id: Optional[int],
+        limit: int,
+) -> dict:
     """
     View for recipes search by category
 
     :param category_name: name of category
     :param session: SQLAlchemy AsyncSession object
     :param current_user: User information object
-    :return: found recipes list
+    :param last_id: id of the last recipe from previous page
+    :param limit: page size
+    :return: found recipes list in GetRecipesResponseModel shape
     """
     # get recipes with selected filters
     recipes = await select_recipes_and_filter_them(
         session=session,
         user_groups=current_user.groups,
         include_categories=[category_name],
+        last_id=last_id,
+        limit=limit,
+        user_id=current_user.id,
     )
-    if not recipes:
-        return GetRecipesResponseModel(recipes=[])
-    # now for each recipe we should make image link and add 'liked' field (it's liked by request user)
-    current_user: Users = await Users.get_by_id(user_id=current_user.id, session=session, join_tables=[
-        Users.groups
-    ])
-    return GetRecipesResponseModel(recipes=build_recipes_output(recipes=recipes, current_user=current_user))
+    # now for each recipe we should make image link and add 'allowed' field by request user groups
+    return build_recipes_page(recipes=recipes, user_groups=current_user.groups, limit=limit)
 
 
 async def get_liked_recipes_view(
         session: AsyncSession,
-        current_user: UserModel
-) -> GetRecipesResponseModel:
+        current_user: UserModel,
+        last_id: Optional[int],
+        limit: int,
+) -> dict:
     """
     View for search only liked recipes
 
     :param session: SQLAlchemy AsyncSession object
     :param current_user: User information object
-    :return: found recipes list
+    :param last_id: id of the last recipe from previous page
+    :param limit: page size
+    :return: found recipes list in GetRecipesResponseModel shape
     """
     async with session.begin():
-        recipes = await select_liked_recipes(session, current_user)
-        if not recipes:
-            return GetRecipesResponseModel(recipes=[])
-        current_user: Users = await Users.get_by_id(user_id=current_user.id, session=session)
-        return GetRecipesResponseModel(recipes=build_recipes_output(recipes=recipes, current_user=current_user))
+        recipes = await select_liked_recipes(session, current_user, last_id=last_id, limit=limit)
+        return build_recipes_page(recipes=recipes, user_groups=current_user.groups, limit=limit)
 
 
 async def get_recipe_view(
         recipe_id: int,
         session: AsyncSession,
         current_user: Optional[UserModel],
-) -> RecipeResponseModel:
+) -> dict:
     """
     View for request recipe by id.
     If recipe with this id not found throws 404_NOT_FOUND exception
@@ -143,25 +153,20 @@ async def get_recipe_view(
     :param recipe_id: id of recipe
     :param session: SQLAlchemy AsyncSession object
     :param current_user: User information object
-    :return: found recipe
+    :return: found recipe in RecipeResponseModel shape
     """
     async with session.begin():
-        recipe = await Recipes.get_by_id(
+        # access is checked by query for authenticated not admin users only
+        recipe, liked = await get_recipe_by_id(
             recipe_id=recipe_id,
             session=session,
-            join_tables=[
-                "*"
-            ]
+            user_id=current_user.id if current_user else None,
+            user_group_ids=current_user.group_ids if current_user and not current_user.is_admin else None,
         )
-        if current_user and ADMIN_GROUP_NAME not in current_user.groups and len(
-                set(group for group in current_user.groups)
-                .intersection(set(i.name for i in recipe.allowed_groups))
-        ) == 0:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="У вас нет досутпа к этому рецепту")
-        return RecipeResponseModel(**build_recipe_output(recipe=recipe, current_user=current_user))
+        return build_recipe_output(recipe=recipe, liked=liked)
 
 
-async def delete_recipe_view(recipe_id: int, session: AsyncSession, current_user) -> DefaultResponse:
+async def delete_recipe_view(recipe_id: int, session: AsyncSession, current_user) -> ORJSONResponse:
     """
     View for recipe deletion by recipe id. If user who try to delete recipe is not recipe creator and not admin, then
     throws 401_UNAUTHORIZED exception
@@ -172,16 +177,10 @@ async def delete_recipe_view(recipe_id: int, session: AsyncSession, current_user
     :return: Response with status
     """
     async with session.begin():
-        recipe: Recipes = await Recipes.get_by_id(
-            recipe_id=recipe_id,
-            session=session,
-            join_tables=[
-                Recipes.allowed_groups,
-                Recipes.user
-            ])
-        await check_is_user_allow_to_modify_recipe(recipe=recipe, current_user=current_user, session=session)
-        await session.delete(recipe)
-        return DefaultResponse(detail="Рецепт был удален")
+        await delete_recipe(recipe_id=recipe_id, current_user=current_user, session=session)
+    clear_recipes_caches()
+    # constant shape response (DefaultResponse) is returned as is, without model validation
+    return ORJSONResponse({"detail": "Рецепт был удален"})
 
 
 async def create_recipe_view(
@@ -196,7 +195,7 @@ async def create_recipe_view(
         allowed_groups: Optional[str],
         session: AsyncSession,
         current_user: UserModel,
-) -> DefaultResponseWithPayload:
+) -> ORJSONResponse:
     """
     View for recipe creation
 
@@ -221,7 +220,7 @@ async def create_recipe_view(
         ingredients=ingredients)
     steps: List[CreateRecipeStepRequestModel] = parse_steps_to_pydantic_models(steps=steps)
     categories: List[str] = parse_categories_to_list(categories)
-    allowed_groups = eval(allowed_groups) if allowed_groups else None
+    allowed_groups = parse_groups_to_list(allowed_groups) if allowed_groups else None
 
     async with session.begin():
         created_recipe_id = await create_new_recipe(
@@ -237,7 +236,9 @@ async def create_recipe_view(
             session=session,
             current_user=current_user
         )
-        return DefaultResponseWithPayload(detail="Рецепт успешно добавлен", payload={"recipe_id": created_recipe_id})
+    clear_recipes_caches()
+    # constant shape response (DefaultResponseWithPayload) is returned as is, without model validation
+    return ORJSONResponse({"detail": "Рецепт успешно добавлен", "payload": {"recipe_id": created_recipe_id}})
 
 
 async def update_recipe_view(
@@ -253,7 +254,7 @@ async def update_recipe_view(
     allowed_groups: Optional[str],
     session: AsyncSession,
     current_user: UserModel,
-):
+) -> ORJSONResponse:
     """
     View for recipe update. If user who try to update recipe is not recipe creator and not admin,
     then throws 401_UNAUTHORIZED exception
@@ -273,14 +274,7 @@ async def update_recipe_view(
     :return: Response with status
     """
     async with session.begin():
-        recipe = await Recipes.get_by_id(
-            recipe_id=recipe_id,
-            session=session,
-            join_tables=[
-                Recipes.compilations, Recipes.allowed_groups, Recipes.ingredients,
-                Recipes.steps, Recipes.categories, Recipes.user
-            ]
-        )
+        recipe = await Recipes.get_by_id(recipe_id=recipe_id, session=session, options=RECIPE_UPDATE_LOAD_OPTIONS)
         await update_recipe(
             recipe=recipe,
             title=title,
@@ -295,5 +289,6 @@ async def update_recipe_view(
             session=session,
             current_user=current_user
         )
-
-        return DefaultResponse(detail="Рецепт обновлен")
+    clear_recipes_caches()
+    # constant shape response (DefaultResponse) is returned as is, without model validation
+    return ORJSONResponse({"detail": "Рецепт обновлен"})
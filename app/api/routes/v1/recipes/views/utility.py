@@ -1,89 +1,91 @@
 """
 Utility views for recipe routes
 """
-import datetime
-import time
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 import sqlalchemy
-from fastapi import HTTPException
+from fastapi import HTTPException, UploadFile
 from sqlalchemy import func
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from starlette import status
 
 from app.api.routes.default_response_models import DefaultResponse
+from app.api.routes.v1.recipes.cache import recipes_list_cache, catalog_cache, clear_recipes_caches
 from app.api.routes.v1.recipes.utility_classes import (
     RecipeLikesRequestModel, FindResponseModel, RecipeFindResponseModel,
-    IngredientFindResponseModel, CategoryFindResponseModel, CreateCompilationRequestModel,
-    RecipeCategoriesResponseModel, RecipeCategoryResponseModel, RecipeCompilationsResponseModel,
+    IngredientFindResponseModel, CategoryFindResponseModel,
+    RecipeCategoriesResponseModel, RecipeCompilationsResponseModel,
     RecipeCompilationResponseModel, GetIngredientsResponseModel, GetDimensionsResponseModel,
     GetIngredientGroupsResponseModel, GetIngredientsWithGroupsResponseModel, RecipeOneCompilationResponseModel,
-    UpdateCompilationRequestModel)
-from app.api.routes.v1.recipes.utils import get_category_image
+    UpdateCompilationRequestModel, RecipeOneCompilationRecipe)
+from app.api.routes.v1.recipes.utils import select_categories_with_images
 from app.api.routes.v1.utils.service_models import UserModel
-from app.api.routes.v1.utils.utility import build_full_path
-from app.constants import PAYED_GROUP_NAME, ADMIN_GROUP_NAME, NOT_AUTHENTICATED_GROUP_NAME
+from app.api.routes.v1.utils.utility import build_full_path, serialize_with_etag
+from app.constants import (
+    PAYED_GROUP_NAME, ADMIN_GROUP_NAME, NOT_AUTHENTICATED_GROUP_NAME,
+    MAX_SEARCH_STRING_LENGTH, MIN_TRIGRAM_SEARCH_STRING_LENGTH)
 from app.database.models.base import (
     RecipeCategories,
     Ingredients,
     RecipeDimensions,
     IngredientsGroups,
-    Users,
     Recipes,
-    RecipeCompilations)
+    RecipeCompilations,
+    Groups,
+    association_recipes_likes)
 from app.utils import S3Manager
 
 
 async def get_recipes_categories_view(
         session: AsyncSession,
         current_user: Optional[UserModel]
-) -> RecipeCategoriesResponseModel:
+) -> Tuple[str, bytes]:
     """
     View returns all recipe categories in service. As category image service selects
     image of first recipe with image in this category
 
     :param current_user: current user info
     :param session: SQLAlchemy AsyncSession
-    :return: Response with existing categories.
+    :return: ETag and serialized response with existing categories.
     """
+    is_admin = bool(current_user and ADMIN_GROUP_NAME in current_user.groups)
+    cache_key = ("categories", is_admin)
+    if (cached := catalog_cache.get(cache_key)) is not None:
+        return cached
     async with session.begin():
-        # First, found all categories
-        stmt = (sqlalchemy
-                .select(RecipeCategories)
-                )
-        response = await session.execute(stmt)
-        categories: List[RecipeCategories] = response.fetchall()
-        # If categories was found, then for each category we should set image.
-        categories = [category[0] for category in categories]
-        if categories:
-            found_categories = []
-            for category in categories:
-                image = await get_category_image(category=category.name, session=session)
-                if image is None and not (current_user and ADMIN_GROUP_NAME in current_user.groups):
-                    continue
-                found_categories.append(RecipeCategoryResponseModel(id=category.id, name=category.name, image=image))
-            return RecipeCategoriesResponseModel(categories=found_categories)
-        else:
-            return RecipeCategoriesResponseModel(categories=[])
+        # categories are selected with their images in one query
+        categories = await select_categories_with_images(session=session)
+        # categories without image are shown only for admins
+        if not is_admin:
+            categories = [category for category in categories if category.image is not None]
+        response = RecipeCategoriesResponseModel(categories=categories)
+    cached = serialize_with_etag(response)
+    catalog_cache.set(cache_key, cached)
+    return cached
 
 
 async def get_recipes_compilations_view(
         session: AsyncSession,
         current_user: Optional[UserModel]
-) -> RecipeCompilationsResponseModel:
+) -> Tuple[str, bytes]:
     """
     View returns all recipe compilations registered in service.
 
     :param current_user: User object
     :param session: SQLALchemy AsyncSession object.
-    :return: Response with compilations
+    :return: ETag and serialized response with compilations
     """
+    user_groups = current_user.groups if current_user else [NOT_AUTHENTICATED_GROUP_NAME]
+    # visible compilations depend only on user groups, so groups set is used as cache key
+    cache_key = ("compilations", frozenset(user_groups))
+    if (cached := catalog_cache.get(cache_key)) is not None:
+        return cached
     async with session.begin():
         # First, select all existing compilations
         compilations: List[RecipeCompilations] = await RecipeCompilations.get_all(session)
         # Then we should filter compilations that current user can see
-        user_groups = current_user.groups if current_user else [NOT_AUTHENTICATED_GROUP_NAME]
         if compilations:
             found_compilations = []
             for compilation in compilations:
@@ -101,9 +103,12 @@ async def get_recipes_compilations_view(
                             position=compilation.position
                         )
                     )
-            return RecipeCompilationsResponseModel(compilations=found_compilations)
+            response = RecipeCompilationsResponseModel(compilations=found_compilations)
         else:
-            return RecipeCompilationsResponseModel(compilations=[])
+            response = RecipeCompilationsResponseModel(compilations=[])
+    cached = serialize_with_etag(response)
+    catalog_cache.set(cache_key, cached)
+    return cached
 
 
 async def get_one_compilation_view(session: AsyncSession, compilation_id: int) -> RecipeOneCompilationResponseModel:
@@ -126,44 +131,48 @@ async def get_one_compilation_view(session: AsyncSession, compilation_id: int) -
             name=compilation.name,
             position=compilation.position,
             image=S3Manager.get_instance().get_url(f"{compilation.image}_small.jpg"),
-            recipes=[i.__dict__ for i in compilation.recipes]
+            recipes=[RecipeOneCompilationRecipe.from_orm(recipe) for recipe in compilation.recipes]
         )
 
 
 async def create_recipes_compilation_view(
         current_user: UserModel,
-        request: CreateCompilationRequestModel,
+        recipe_ids: List[int],
+        title: str,
+        image: UploadFile,
         session: AsyncSession):
     """
     View that creates recipe compilation.
     Description: Compilation is name for a bunch of grouped recipes by admin. Admin should name it and set an image.
 
     :param current_user: User information object
-    :param request: Request with compilation data
+    :param recipe_ids: id's of recipes that should appear in new compilation
+    :param title: Compilation title
+    :param image: Compilation image
     :param session: SQLAlchemy AsyncSession object.
     :return: Response with status
     """
     async with session.begin():
-        # First, load all recipes, selected for new compilation
-        recipes_list: List[Recipes] = [
-            await Recipes.get_by_id(recipe_id, session)
-            for recipe_id
-            in request.recipe_ids
-        ]
+        # First, load all recipes, selected for new compilation, with one query
+        response = await session.execute(sqlalchemy.select(Recipes).where(Recipes.id.in_(recipe_ids)))
+        recipes_list: List[Recipes] = response.scalars().all()
+        if len(recipes_list) != len(set(recipe_ids)):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Рецепт не найден")
         # find position of new compilation (compilations_count+1)
         compilations_count = len(await RecipeCompilations.get_all(session))
 
         # Load compilation image to s3
-        filename = build_full_path(f"{current_user.username}/compilations/{request.title}", request.image)
-        S3Manager.get_instance().send_image_shaped(image=request.image, base_filename=filename)
+        filename = build_full_path(f"{current_user.username}/compilations/{title}", image)
+        S3Manager.get_instance().send_image_shaped(image=image, base_filename=filename)
 
         new_compilation = await RecipeCompilations.create(
-            name=request.title,
+            name=title,
             image=filename,
             position=compilations_count+1,
             recipes=recipes_list
         )
         session.add(new_compilation)
+    clear_recipes_caches()
     return DefaultResponse(detail="Подборка добавлена")
 
 
@@ -181,12 +190,6 @@ async def update_recipes_compilation_view(
     :return: Response with status
     """
     async with session.begin():
-        # First, select all recipes, selected for new compilation
-        recipes_list: List[Recipes] = [
-            await Recipes.get_by_id(recipe_id, session)
-            for recipe_id
-            in request.recipe_ids
-        ]
         new_image = None
         if request.image:
             # Load compilation image to s3
@@ -199,10 +202,10 @@ async def update_recipes_compilation_view(
             position=request.position,
             name=request.title,
             image=new_image if new_image else None,
-            recipes=recipes_list
-
+            recipe_ids=request.recipe_ids
         )
         await session.commit()
+    clear_recipes_caches()
     return DefaultResponse(detail="Подборка обновлена")
 
 
@@ -221,16 +224,19 @@ async def delete_recipes_compilation_view(
         # First, select all recipes, selected for new compilation
         await RecipeCompilations.delete(session=session, compilation_id=compilation_id)
         await session.commit()
+    clear_recipes_caches()
     return DefaultResponse(detail="Подборка удалена")
 
 
-async def get_ingredients_view(session: AsyncSession) -> GetIngredientsResponseModel:
+async def get_ingredients_view(session: AsyncSession) -> Tuple[str, bytes]:
     """
     View that returns all ingredients in service.
 
     :param session: SQLAlchemy AsyncSession object.
-    :return: Response with existing ingredients.
+    :return: ETag and serialized response with existing ingredients.
     """
+    if (cached := catalog_cache.get("ingredients")) is not None:
+        return cached
     async with (session.begin()):
         stmt = sqlalchemy.select(Ingredients)
         response = await session.execute(stmt)
@@ -245,16 +251,21 @@ async def get_ingredients_view(session: AsyncSession) -> GetIngredientsResponseM
             ]
         else:
             output_ingredients: List[IngredientFindResponseModel] = []
-        return GetIngredientsResponseModel(ingredients=output_ingredients)
+        response = GetIngredientsResponseModel(ingredients=output_ingredients)
+    cached = serialize_with_etag(response)
+    catalog_cache.set("ingredients", cached)
+    return cached
 
 
-async def get_ingredients_with_groups_view(session: AsyncSession) -> GetIngredientsWithGroupsResponseModel:
+async def get_ingredients_with_groups_view(session: AsyncSession) -> Tuple[str, bytes]:
     """
     View that returns all ingredients in service.
 
     :param session: SQLAlchemy AsyncSession object.
-    :return: Response with existing ingredients.
+    :return: ETag and serialized response with existing ingredients.
     """
+    if (cached := catalog_cache.get("ingredients_with_groups")) is not None:
+        return cached
     async with session.begin():
         stmt = sqlalchemy.select(Ingredients).options(selectinload(Ingredients.groups))
         response = await session.execute(stmt)
@@ -263,16 +274,21 @@ async def get_ingredients_with_groups_view(session: AsyncSession) -> GetIngredie
             ingredients = [{"name": i[0].name, "groups":[j.name for j in i[0].groups]} for i in ingredients]
         else:
             ingredients = []
-        return GetIngredientsWithGroupsResponseModel(ingredients=ingredients)
+        response = GetIngredientsWithGroupsResponseModel(ingredients=ingredients)
+    cached = serialize_with_etag(response)
+    catalog_cache.set("ingredients_with_groups", cached)
+    return cached
 
 
-async def get_dimensions_view(session: AsyncSession) -> GetDimensionsResponseModel:
+async def get_dimensions_view(session: AsyncSession) -> Tuple[str, bytes]:
     """
     View that returns all dimensions in service.
 
     :param session: SQLAlchemy AsyncSession object.
-    :return: Response with existing dimensions.
+    :return: ETag and serialized response with existing dimensions.
     """
+    if (cached := catalog_cache.get("dimensions")) is not None:
+        return cached
     async with session.begin():
         stmt = sqlalchemy.select(RecipeDimensions.name)
         response = await session.execute(stmt)
@@ -281,16 +297,21 @@ async def get_dimensions_view(session: AsyncSession) -> GetDimensionsResponseMod
             dimensions = [i[0] for i in dimensions]
         else:
             dimensions = []
-        return GetDimensionsResponseModel(dimensions=dimensions)
+        response = GetDimensionsResponseModel(dimensions=dimensions)
+    cached = serialize_with_etag(response)
+    catalog_cache.set("dimensions", cached)
+    return cached
 
 
-async def get_ingredients_groups_view(session: AsyncSession) -> GetIngredientGroupsResponseModel:
+async def get_ingredients_groups_view(session: AsyncSession) -> Tuple[str, bytes]:
     """
     View that returns all ingredient groups in service.
 
     :param session: SQLAlchemy AsyncSession object.
-    :return: Response with existing ingredient groups.
+    :return: ETag and serialized response with existing ingredient groups.
     """
+    if (cached := catalog_cache.get("ingredients_groups")) is not None:
+        return cached
     async with session.begin():
         stmt = sqlalchemy.select(IngredientsGroups.name)
         response = await session.execute(stmt)
@@ -299,7 +320,10 @@ async def get_ingredients_groups_view(session: AsyncSession) -> GetIngredientGro
             groups = [i[0] for i in groups]
         else:
             groups = []
-        return GetIngredientGroupsResponseModel(groups=groups)
+        response = GetIngredientGroupsResponseModel(groups=groups)
+    cached = serialize_with_etag(response)
+    catalog_cache.set("ingredients_groups", cached)
+    return cached
 
 
 async def toggle_recipe_like_view(
@@ -317,60 +341,79 @@ async def toggle_recipe_like_view(
     :return: Response with status
     """
     async with session.begin():
-        # First we needs to get mapped user object from database
-        t = datetime.datetime.now()
-        current_user = await Users.get_by_id(session=session, user_id=current_user.id, join_tables=[Users.liked_recipes])
-        # Then we need to get recipe object
-        t = datetime.datetime.now()
-        recipe = await Recipes.get_by_id(recipe_id=recipe.recipe_id, session=session)
-        # Now if recipe is not liked, then we should add it to likes
-        if recipe not in current_user.liked_recipes:
-            t = datetime.datetime.now()
-            current_user.liked_recipes.append(recipe)
-            return DefaultResponse(detail="Рецепт добавлен в избранное")
-        # If recipe already liked, then we should delete it from likes
+        # First try to remove like. If it was removed, then recipe was liked before
+        stmt = (
+            sqlalchemy.delete(association_recipes_likes)
+            .where(association_recipes_likes.c.user_id == current_user.id)
+            .where(association_recipes_likes.c.recipe_id == recipe.recipe_id)
+            .returning(association_recipes_likes.c.recipe_id)
+        )
+        if (await session.execute(stmt)).first():
+            response = DefaultResponse(detail="Рецепт удален из избранного")
+        # Else like should be added. Recipe is selected in the same statement, so nothing is inserted
+        # if recipe does not exist
         else:
-            t = datetime.datetime.now()
-            current_user.liked_recipes.remove(recipe)
-            return DefaultResponse(detail="Рецепт удален из избранного")
-
-
-async def search_by_field(string_to_find, max_returns, model, field, session, join_tables=()):
+            stmt = (
+                postgresql.insert(association_recipes_likes)
+                .from_select(
+                    ["user_id", "recipe_id"],
+                    sqlalchemy.select(sqlalchemy.literal(current_user.id), Recipes.id)
+                    .where(Recipes.id == recipe.recipe_id))
+                .on_conflict_do_nothing(index_elements=["recipe_id", "user_id"])
+                .returning(association_recipes_likes.c.recipe_id)
+            )
+            # nothing is inserted when recipe does not exist or when like was added by concurrent request.
+            # Recipe existence is checked only on this rare path, so concurrent like is not reported as 404
+            if not (await session.execute(stmt)).first() and not await session.scalar(
+                    sqlalchemy.select(Recipes.id).where(Recipes.id == recipe.recipe_id)):
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Рецепт не найден")
+            response = DefaultResponse(detail="Рецепт добавлен в избранное")
+    # cached recipes lists of this user contain old 'liked' state. Lists are dropped only in this worker, other
+    # workers return them until RECIPES_LIST_CACHE_TTL expires
+    recipes_list_cache.pop(current_user.id)
+    return response
+
+
+def build_search_by_field_query(
+        kind: str, string_to_find: str, max_returns: int, model, field, filters=(), fuzzy: bool = False):
     """
-    Utility method that search in selected field in selected model for entries. If there are full compare, then
-    method will return only fully compared rows, else it will return **max_returns** rows with substring compares.
+    Utility method that builds search query for selected field in selected model. Semi-compared rows are rows
+    that contain string_to_find, and if fuzzy passed, also rows similar to it (pg_trgm similarity). Rows are
+    ordered so fully compared rows are first, then semi-compared rows by similarity. Each row contains search kind,
+    object id, found field value and full compare flag.
 
+    :param kind: Name of searched objects, returned in each row.
     :param string_to_find: String for search.
     :param max_returns: Max returns for semi-compared rows.
     :param model: SQLAlchemy model for search.
     :param field: SQLAlchemy model field for search.
-    :param join_tables: Tables that should be joined
-    :param session: SQLAlchemy AsyncSession object.
-    :return: List of found objects.
+    :param filters: Additional filters for model.
+    :param fuzzy: If passed, rows similar to string_to_find are also found, even if they do not contain it.
+    :return: Search query.
     """
-    search_by_full_compare = sqlalchemy.select(model).where(field == string_to_find).limit(1)
-    if join_tables:
-        for table in join_tables:
-            search_by_full_compare = search_by_full_compare.options(selectinload(table))
-    resp = await session.execute(search_by_full_compare)
-    resp = resp.scalars().first()
-    if resp:
-        return [resp]
-    else:
-        search_by_semi_compare = (
-            sqlalchemy.select(model)
-            .filter(func.lower(field).like(f"%{string_to_find.lower()}%"))
-            .limit(max_returns)
+    full_compare = field == string_to_find
+    # lower(field) has trigram index, so substring and similarity search don't scan whole table
+    lowered_string = string_to_find.lower()
+    escaped_string = lowered_string.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    semi_compare = func.lower(field).like(f"%{escaped_string}%", escape="\\")
+    order_by = (full_compare.desc(),)
+    # short strings have no trigrams, so they are not compared by similarity
+    if len(lowered_string) >= MIN_TRIGRAM_SEARCH_STRING_LENGTH:
+        if fuzzy:
+            semi_compare = sqlalchemy.or_(semi_compare, func.lower(field).op("%")(lowered_string))
+        order_by = (full_compare.desc(), func.similarity(func.lower(field), lowered_string).desc())
+    stmt = (
+        sqlalchemy.select(
+            sqlalchemy.literal(kind).label("kind"),
+            model.id.label("id"),
+            field.label("value"),
+            full_compare.label("full_compare"),
         )
-        if join_tables:
-            for table in join_tables:
-                search_by_semi_compare = search_by_semi_compare.options(selectinload(table))
-        resp = await session.execute(search_by_semi_compare)
-        resp = resp.scalars().all()
-        if resp:
-            return resp
-        else:
-            return []
+        .where(sqlalchemy.or_(full_compare, semi_compare), *filters)
+        .order_by(*order_by)
+        .limit(max_returns)
+    )
+    return sqlalchemy.select(stmt.subquery())
 
 
 async def find_all_view(
@@ -378,47 +421,45 @@ async def find_all_view(
         current_user: Optional[UserModel],
         session: AsyncSession,
         max_returns: int = 5,
+        fuzzy: bool = False,
 ) -> FindResponseModel:
     """
     Method will search string_to_find in all searchable models: recipes, ingredients, recipe categories. First,
     it returns only fully compared database rows for each model. If fully compared rows not found, then it searches
-    semi-compared rows.
+    semi-compared rows. All models are searched with one query.
 
     :param string_to_find: String for search.
     :param max_returns: Maximum returned rows for each model.
     :param current_user: User information object.
     :param session: SQLAlchemy AsyncSession object.
+    :param fuzzy: If passed, rows similar to string_to_find are also found, even if they do not contain it.
     :return: Response with found objects for each model.
     """
+    string_to_find = string_to_find[:MAX_SEARCH_STRING_LENGTH]
+    # some recipes do not have images, so filter them. Not payed users can find only free recipes
+    recipe_filters = [Recipes.image.isnot(None)]
+    if not current_user or PAYED_GROUP_NAME not in current_user.groups:
+        recipe_filters.append(Recipes.allowed_groups.any(Groups.name == NOT_AUTHENTICATED_GROUP_NAME))
+    stmt = sqlalchemy.union_all(
+        build_search_by_field_query(
+            "recipe", string_to_find, max_returns, Recipes, Recipes.title, recipe_filters, fuzzy=fuzzy),
+        build_search_by_field_query(
+            "category", string_to_find, max_returns, RecipeCategories, RecipeCategories.name, fuzzy=fuzzy),
+        build_search_by_field_query(
+            "ingredient", string_to_find, max_returns, Ingredients, Ingredients.name, fuzzy=fuzzy),
+    )
     async with session.begin():
-        response_model = FindResponseModel(recipes=[], ingredients=[], categories=[])
-
-        # FIND IN RECIPES
-        search_recipes: List[Recipes] = await search_by_field(
-            string_to_find=string_to_find,
-            max_returns=max_returns,
-            model=Recipes,
-            field=Recipes.title,
-            join_tables=[Recipes.allowed_groups],
-            session=session)
-
-        search_recipes = list(filter(lambda x: x.image != None, search_recipes))
-        if not current_user or PAYED_GROUP_NAME not in current_user.groups:
-            search_recipes = list(filter(lambda x: NOT_AUTHENTICATED_GROUP_NAME in [group.name for group in x.allowed_groups], search_recipes))
-        response_model.recipes = [RecipeFindResponseModel(title=i.title, recipe_id=i.id) for i in search_recipes]
-        # FIND IN CATEGORIES
-        searh_categories: List[RecipeCategories] = await search_by_field(string_to_find=string_to_find,
-                                                                         max_returns=max_returns,
-                                                                         model=RecipeCategories,
-                                                                         field=RecipeCategories.name, session=session)
-        response_model.categories = [CategoryFindResponseModel(name=category.name, category_id=category.id) for category
-                                     in searh_categories]
-        # FIND IN INGREDIENTS
-        searh_ingredients: List[Ingredients] = await search_by_field(string_to_find=string_to_find,
-                                                                     max_returns=max_returns, model=Ingredients,
-                                                                     field=Ingredients.name, session=session)
-        response_model.ingredients = [IngredientFindResponseModel(name=ingredient.name, ingredient_id=ingredient.id) for
-                                      ingredient in searh_ingredients]
-
-
-        return response_model
+        response = await session.execute(stmt)
+        found: dict = {"recipe": [], "category": [], "ingredient": []}
+        for row in response:
+            found[row.kind].append(row)
+    # if fully compared row found, then only it is returned
+    for kind, rows in found.items():
+        fully_compared_rows = [row for row in rows if row.full_compare]
+        if fully_compared_rows:
+            found[kind] = fully_compared_rows[:1]
+    return FindResponseModel(
+        recipes=[RecipeFindResponseModel(title=row.value, recipe_id=row.id) for row in found["recipe"]],
+        categories=[CategoryFindResponseModel(name=row.value, category_id=row.id) for row in found["category"]],
+        ingredients=[IngredientFindResponseModel(name=row.value, ingredient_id=row.id) for row in found["ingredient"]],
+    )
@@ -16,7 +16,7 @@ from app.constants import ACCESS_TOKEN_EXPIRE_MINUTES
 from app.api.routes.v1.users.router import router as users_router
 from app.api.routes.v1.recipes.router import router as recipes_router
 from app.api.routes.v1.blog.router import router as blog_router
-from app.database import DatabaseManagerAsync
+from app.database import get_session
 from app.database.models.base import Users, RecoveryLog
 from app.utils.email_service import EmailService
 
@@ -51,7 +51,7 @@ async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(
 @router.post("/recovery", response_model=DefaultResponse)
 async def password_recovery(
         email: str = Form(...),
-        session: AsyncSession = Depends(DatabaseManagerAsync.get_instance().get_session_object)
+        session: AsyncSession = Depends(get_session)
 ):
     user = await Users.get_by_email(session=session, email=email)
     recovery = await RecoveryLog.create(key=uuid.uuid4().hex, user_id=user.id)
@@ -69,7 +69,7 @@ async def password_recovery(
 async def set_new_password(
     recovery_key: str = Form(...),
     new_password: str = Form(...),
-    session: AsyncSession = Depends(DatabaseManagerAsync.get_instance().get_session_object)
+    session: AsyncSession = Depends(get_session)
 ):
     recovery = await RecoveryLog.get_by_key(key=recovery_key, session=session)
     if recovery.expire.replace(tzinfo=None) < datetime.datetime.now():
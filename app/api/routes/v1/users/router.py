@@ -15,7 +15,7 @@ from app.api.routes.v1.users.views import register_user_view, delete_user_view,
     update_user_view, authenticate_by_provider_view, get_all_users_view, get_user_by_id_view
 from app.api.routes.v1.utils.auth import get_user_by_token, get_admin_by_token
 from app.api.routes.v1.utils.service_models import UserModel
-from app.database import DatabaseManagerAsync
+from app.database import get_session
 from app.database.models.base import Users
 from app.utils import S3Manager
 from app.utils.auth import AvailableAuthProviders
@@ -27,7 +27,7 @@ router.include_router(groups_router)
 @router.get("/me", response_model=UserRequestResponse)
 async def get_me(
         current_user: UserModel = Depends(get_user_by_token),
-        session: AsyncSession = Depends(DatabaseManagerAsync.get_instance().get_session_object)
+        session: AsyncSession = Depends(get_session)
 ) -> UserRequestResponse:
     """
     Gets user object by token.
@@ -46,7 +46,7 @@ async def get_me(
 
 @router.get("/get_all", response_model=UsersRequestResponse, dependencies=[Depends(get_admin_by_token)])
 async def get_all_users(
-    session: AsyncSession = Depends(DatabaseManagerAsync.get_instance().get_session_object),
+    session: AsyncSession = Depends(get_session),
 ) -> UsersRequestResponse:
     """
     Returns all users
@@ -65,7 +65,7 @@ async def get_all_users(
 )
 async def get_user_by_id(
         user_id: int,
-        session: AsyncSession = Depends(DatabaseManagerAsync.get_instance().get_session_object),
+        session: AsyncSession = Depends(get_session),
 ) -> UserRequestResponse:
     """
     Gets user object by user id.
@@ -81,7 +81,7 @@ async def get_user_by_id(
 @router.post("/", response_model=DefaultResponse)
 async def register_user(
         user: RegisterRequestModel,
-        session: AsyncSession = Depends(DatabaseManagerAsync.get_instance().get_session_object)
+        session: AsyncSession = Depends(get_session)
 ) -> DefaultResponse:
     """
     Register a new user.
@@ -97,7 +97,7 @@ async def register_user(
 async def authenticate_by_provider(
         token: str,
         provider: AvailableAuthProviders,
-        session: AsyncSession = Depends(DatabaseManagerAsync.get_instance().get_session_object),
+        session: AsyncSession = Depends(get_session),
 ) -> UserAuthResponse:
     """
     This route is using for apple authentication. First it receives a Google token. After,
@@ -114,7 +114,7 @@ async def authenticate_by_provider(
 
 
 @router.delete("/", response_model=DefaultResponse)
-async def delete_user(session: AsyncSession = Depends(DatabaseManagerAsync.get_instance().get_session_object),
+async def delete_user(session: AsyncSession = Depends(get_session),
                       current_user: UserModel = Depends(get_user_by_token)):
     """
     Delete a user by token. With this route authenticated user with token can delete account.
@@ -133,7 +133,7 @@ async def update_user(username=Form(default=None),
                       info=Form(default=None),
                       groups=Form(default=None),
                       image: UploadFile = File(default=None),
-                      session: AsyncSession = Depends(DatabaseManagerAsync.get_instance().get_session_object),
+                      session: AsyncSession = Depends(get_session),
                       current_user: UserModel = Depends(get_user_by_token),
                       ):
     """
@@ -8,6 +8,7 @@ from datetime import timedelta
 from io import BytesIO
 from typing import Optional, List
 
+import orjson
 import requests
 import sqlalchemy
 from fastapi import HTTPException, Form, UploadFile, File
@@ -17,9 +18,11 @@ from starlette import status
 
 from app.api.routes.default_response_models import DefaultResponse, UserRequestResponse, User, UserAuthResponse, \
     UsersRequestResponse
-from app.api.routes.v1.groups.utils import get_group_model_or_create_if_not_exists
+from app.api.routes.v1.groups.utils import (
+    get_group_model_or_create_if_not_exists, get_group_models_or_create_if_not_exist)
+from app.api.routes.v1.recipes.cache import recipes_list_cache
 from app.api.routes.v1.users.models import RegisterRequestModel
-from app.api.routes.v1.utils.auth import get_user_by_token, get_password_hash
+from app.api.routes.v1.utils.auth import get_user_by_token, get_password_hash, remove_cached_user
 from app.api.routes.v1.utils.service_models import UserModel
 from app.api.routes.v1.utils.utility import build_full_path
 from app.constants import DEFAULT_USER_GROUP_NAME, ADMIN_GROUP_NAME
@@ -147,7 +150,9 @@ async def delete_user_view(
         for recipe in user.created_recipes:
             await session.delete(recipe)
         await session.delete(user)
-        return DefaultResponse(detail=f"Пользователь с ником '{user_to_delete.username}' удален из приложения")
+    # cached user by token should not be authenticated anymore
+    remove_cached_user(user_to_delete.id)
+    return DefaultResponse(detail=f"Пользователь с ником '{user_to_delete.username}' удален из приложения")
 
 
 async def update_user_view(
@@ -179,6 +184,7 @@ async def update_user_view(
         if ADMIN_GROUP_NAME not in current_user.groups and username!=current_user.username:
             raise HTTPException(status_code=403, detail="Вам нельзя редактировать этого пользователя")
         user: Users = await Users.get_by_username(session=session, username=username, join_tables=[Users.groups])
+        updated_user_id = user.id
         if username:
             user.username = username
         if email:
@@ -192,24 +198,30 @@ async def update_user_view(
             S3Manager.get_instance().send_image_shaped(image=image, base_filename=filename)
             user.image = filename
         if groups:
-            groups = eval(groups.replace("null", "None"))
+            try:
+                groups = orjson.loads(groups)
+            except orjson.JSONDecodeError:
+                raise HTTPException(status_code=422, detail="Проверьте правильность введенных групп")
 
-            new_user_groups = []
             for group in groups:
                 group["expiration_time"] = datetime.datetime.strptime(group["expiration_time"], "%Y-%m-%d") if group["expiration_time"] else None
-                new_user_groups.append(await get_group_model_or_create_if_not_exists(group["name"], session))
-            user.groups = new_user_groups
+            # all groups are selected (or created) with one query and then reused by name, so their ids are
+            # known after commit without selecting them again
+            group_models = await get_group_models_or_create_if_not_exist((group["name"] for group in groups), session)
+            user.groups = [group_models[group["name"]] for group in groups]
             user_id = user.id
             await session.commit()
             async with DatabaseManagerAsync.get_instance().get_session() as temp_session:
                 for group in groups:
                     if group["expiration_time"] is None:
                         continue
-                    tmp = await get_group_model_or_create_if_not_exists(group["name"], temp_session)
                     await Groups.update_expiration_time(
                         user_id=user_id,
-                        group_id=tmp.id,
+                        group_id=group_models[group["name"]].id,
                         expiration_time=group["expiration_time"],
                         session=temp_session
                     )
-        return DefaultResponse(detail="Информация о пользователе обновлена")
+    # cached user by token and recipes lists (filtered by user groups) contain old user information
+    remove_cached_user(updated_user_id)
+    recipes_list_cache.pop(updated_user_id)
+    return DefaultResponse(detail="Информация о пользователе обновлена")
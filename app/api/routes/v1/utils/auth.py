@@ -2,6 +2,7 @@
 Module contains all methods for user authentication
 """
 
+import time
 from datetime import datetime, timedelta
 from typing import Union, Optional
 
@@ -16,14 +17,57 @@ from starlette import status
 from app.api.routes.v1.utils.exceptions import CredentialsException
 from app.api.routes.v1.utils.service_models import UserModel
 from app.config import settings
-from app.constants import ADMIN_GROUP_NAME
+from app.constants import ADMIN_GROUP_NAME, USERS_BY_TOKEN_CACHE_TTL, USERS_BY_TOKEN_CACHE_SIZE
 from app.database import DatabaseManagerAsync
 from app.database.models.base import Users
+from app.utils.cache import TTLCache
 from passlib.context import CryptContext
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 SECRET_KEY = settings.api.secret_key
 ALGORITHM = "HS256"
+# users with token expiration time by token. Token is decoded and user is selected from database only once per
+# cache ttl. Entries of user should be removed when user data (groups, username, etc...) changes
+users_by_token_cache = TTLCache(ttl=USERS_BY_TOKEN_CACHE_TTL, maxsize=USERS_BY_TOKEN_CACHE_SIZE)
+
+
+def get_cached_user_by_token(token: str) -> Optional[UserModel]:
+    """
+    Function returns cached user by token. Token is not decoded on cache hit, so its expiration time is checked here.
+
+    :param token: bearer token
+    :return: User instance or None if user is not cached or token is expired
+    """
+    cached = users_by_token_cache.get(token)
+    if cached is None:
+        return None
+    user, expire_at = cached
+    if expire_at <= time.time():
+        users_by_token_cache.pop(token)
+        return None
+    return user
+
+
+def cache_user_by_token(token: str, payload: dict, user: UserModel) -> None:
+    """
+    Function caches user by token with token expiration time.
+
+    :param token: bearer token
+    :param payload: decoded token payload
+    :param user: User instance
+    :return: None
+    """
+    users_by_token_cache.set(token, (user, payload.get("exp", float("inf"))))
+
+
+def remove_cached_user(user_id: int) -> None:
+    """
+    Function removes all cached tokens of user. Should be called after user data changes are committed.
+
+    :param user_id: id of user
+    :return: None
+    """
+    users_by_token_cache.pop_by_value(lambda cached: cached[0].id == user_id)
 
 
 def verify_password(plain_password, hashed_password) -> True:
@@ -75,6 +119,7 @@ async def get_user(username: str) -> UserModel:
         if user:
             user_dict = user.__dict__.copy()
             user_dict["groups"] = [group.name for group in user.groups]
+            user_dict["group_ids"] = [group.id for group in user.groups]
             user_to_return = UserModel(**user_dict)
             return user_to_return
         else:
@@ -123,6 +168,8 @@ async def get_user_by_token(
     :param token: Request header bearer token that will be received via FastAPI dependency.
     :return: User instance
     """
+    if (cached_user := get_cached_user_by_token(token)) is not None:
+        return cached_user
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
@@ -131,6 +178,7 @@ async def get_user_by_token(
     except JWTError:
         raise CredentialsException()
     user_to_return = await get_user(username=username)
+    cache_user_by_token(token, payload, user_to_return)
     return user_to_return
 
 
@@ -144,6 +192,8 @@ async def get_user_by_token_or_none(
     :param token: Request header bearer token that will be received via FastAPI dependency.
     :return: User instance
     """
+    if token and (cached_user := get_cached_user_by_token(token)) is not None:
+        return cached_user
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
@@ -152,6 +202,7 @@ async def get_user_by_token_or_none(
     except:
         return None
     user_to_return = await get_user(username=username)
+    cache_user_by_token(token, payload, user_to_return)
     return user_to_return
 
 
@@ -6,6 +6,7 @@ from typing import Optional
 
 from pydantic import BaseModel
 
+from app.constants import ADMIN_GROUP_NAME
 from app.log import default_logger
 
 
@@ -20,6 +21,12 @@ class UserModel(BaseModel):
     info: str
     image: Optional[str]
     groups: list[str]
+    group_ids: list[int]
+
+    @property
+    def is_admin(self) -> bool:
+        """is user in admin group"""
+        return ADMIN_GROUP_NAME in self.groups
 
     def log_debug(self, message):
         default_logger.debug(f"USER_LOG[{self.username}, {self.id}] - {message}")
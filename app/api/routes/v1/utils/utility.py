@@ -1,7 +1,13 @@
+import hashlib
 import io
+from typing import Optional, Tuple, Union
+
+import orjson
 
 from PIL.Image import Image
-from fastapi import UploadFile
+from fastapi import UploadFile, Request, Response
+from pydantic import BaseModel
+from starlette import status
 
 
 def translate_all(text: str) -> str:
@@ -54,3 +60,57 @@ def convert_pillow_image_to_jpg_bytes(image: Image) -> bytes:
     imag_byte_arr = io.BytesIO()
     image.convert("RGB").save(imag_byte_arr, format='jpeg')
     return imag_byte_arr.getvalue()
+
+
+def build_etag(body: bytes) -> str:
+    """
+    Method builds ETag header value for response body. ETag is weak, because GZipMiddleware sends the same ETag
+    with compressed body, which is not byte-identical to the hashed one.
+
+    :param body: Serialized response body
+    :return: ETag value
+    """
+    return f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def is_etag_matched(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Method checks If-None-Match header value with weak comparison: "W/" prefixes are ignored, header can
+    contain list of ETags or "*".
+
+    :param if_none_match: If-None-Match header value
+    :param etag: ETag of body
+    :return: True if client already has body with this ETag
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque_tag = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque_tag for tag in if_none_match.split(","))
+
+
+def serialize_with_etag(content: Union[BaseModel, dict]) -> Tuple[str, bytes]:
+    """
+    Method serializes response model (or dict in response model shape) to json and builds ETag for it.
+
+    :param content: Response model or dict
+    :return: ETag and serialized json body
+    """
+    body = orjson.dumps(content.dict() if isinstance(content, BaseModel) else content)
+    return build_etag(body), body
+
+
+def build_json_response_with_etag(request: Request, etag: str, body: bytes) -> Response:
+    """
+    Method builds response for already serialized json body. If client already has this body
+    (If-None-Match header equals to ETag), then body is not sent and 304_NOT_MODIFIED is returned.
+
+    :param request: Request object
+    :param etag: ETag of body
+    :param body: Serialized json body
+    :return: Response object
+    """
+    if is_etag_matched(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
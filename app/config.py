@@ -18,6 +18,14 @@ class Database(BaseModel):
     """database password"""
     name: str
     """database name"""
+    statement_cache_size: int = 256
+    """size of asyncpg prepared statements cache per connection (set 0 when working behind PgBouncer)"""
+    query_cache_size: int = 1200
+    """size of sqlalchemy compiled sql cache per engine"""
+    pool_size: int = 20
+    """count of connections kept in pool per worker"""
+    max_overflow: int = 10
+    """count of connections that can be opened above pool_size per worker"""
 
     @validator("host")
     def cleanup_host(cls, host):
@@ -14,6 +14,32 @@ PAYED_GROUP_NAME = "payed"
 MAX_STORIES_COUNT = 10
 # max returned stories count
 MAX_ARTICLES_COUNT = 10
+# time to live in seconds for cached recipes list. Cache is not shared between workers, so other workers can return
+# old 'liked' state for up to this time after like toggle
+RECIPES_LIST_CACHE_TTL = 60
+# max count of users with cached recipes lists
+RECIPES_LIST_CACHE_USERS_SIZE = 1024
+# max count of cached recipes lists of one user
+RECIPES_LIST_CACHE_USER_SIZE = 16
+# time to live in seconds for cached catalogs (categories, ingredients, dimensions, ingredient groups, compilations)
+CATALOG_CACHE_TTL = 300
+# time to live in seconds for cached users by auth token. Cache is not shared between workers, so other workers
+# can use old user information (groups, username) for up to this time after user changes
+USERS_BY_TOKEN_CACHE_TTL = 30
+# max count of cached users by auth token
+USERS_BY_TOKEN_CACHE_SIZE = 4096
+# min response body size in bytes to compress it with gzip
+GZIP_MINIMUM_RESPONSE_SIZE = 1024
+# max length of search string, longer strings are cut
+MAX_SEARCH_STRING_LENGTH = 64
+# min length of search string for similarity (fuzzy) search and ordering. Shorter strings have no trigrams
+MIN_TRIGRAM_SEARCH_STRING_LENGTH = 3
+# max count of images uploaded to s3 at the same time by one worker
+S3_MAX_CONCURRENT_UPLOADS = 4
+# page size of recipes list, if client does not pass it
+DEFAULT_RECIPES_PAGE_SIZE = 50
+# max page size of recipes list
+MAX_RECIPES_PAGE_SIZE = 200
 # superuser login for development (user will be created if 'development' set in ENVRIONMENT env variable)
 DEV_SUPERUSER_LOGIN = "admin@mail.ru"
 # superuser password for development.
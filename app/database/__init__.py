@@ -1 +1 @@
-from .manager import DatabaseManagerSync, DatabaseManagerAsync
+from .manager import DatabaseManagerSync, DatabaseManagerAsync, get_session
@@ -4,8 +4,9 @@ and async (DatabaseManagerAsync) connections.
 ATTENTION: managers uses postgres databases (^11.11).
 """
 
+import asyncio
 import contextlib
-from typing import Optional
+from typing import Optional, AsyncIterator
 
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
@@ -30,6 +31,14 @@ class _DatabaseManager:
     """database user password"""
     _dbname: str
     """database name"""
+    _statement_cache_size: int
+    """size of prepared statements cache per connection"""
+    _query_cache_size: int
+    """size of compiled sql cache per engine"""
+    _pool_size: int
+    """count of connections kept in pool"""
+    _max_overflow: int
+    """count of connections that can be opened above pool size"""
     _engine: Optional[Engine]
     """database engine string"""
 
@@ -48,6 +57,10 @@ class _DatabaseManager:
         self._user = user
         self._password = password
         self._dbname = dbname
+        self._statement_cache_size = settings.database.statement_cache_size
+        self._query_cache_size = settings.database.query_cache_size
+        self._pool_size = settings.database.pool_size
+        self._max_overflow = settings.database.max_overflow
 
 
 class DatabaseManagerSync(_DatabaseManager):
@@ -129,8 +142,41 @@ class DatabaseManagerAsync(_DatabaseManager):
         """
         self._engine: AsyncEngine = create_async_engine(
             f"postgresql+asyncpg://{self._user}:{self._password}@{self._host}:{self._port}/{self._dbname}",
-            pool_size=1000,
+            pool_size=self._pool_size,
+            max_overflow=self._max_overflow,
+            # most recently used connection is taken first, so under low load only few connections are used
+            # and the rest are recycled instead of being kept warm
+            pool_use_lifo=True,
+            # connections are not pinged before use, because ping is an additional round trip on every checkout.
+            # Long-living connections are recreated instead, so connections dropped by database or network idle
+            # timeouts are not kept in pool. Connection dropped by database restart fails one request and
+            # is removed from pool
+            pool_pre_ping=False,
+            pool_recycle=3600,
+            # compiled sql is cached by statement shape and shared by all requests. Recipes lists have
+            # many filter combinations, so default cache (500) is enlarged to keep them all compiled
+            query_cache_size=self._query_cache_size,
+            # prepared statements are cached per connection, so postgres does not parse and plan
+            # the same queries on every request
+            # jit is turned off, because for short oltp queries jit compilation takes longer than query itself
+            connect_args={
+                "prepared_statement_cache_size": self._statement_cache_size,
+                "statement_cache_size": self._statement_cache_size,
+                "server_settings": {"jit": "off"},
+            },
         )
+        # session factory is created once and shared by all sessions. Objects are not expired on commit,
+        # because expired attributes can't be lazy loaded in async session
+        self._session_maker = sessionmaker(self._engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def warm_up_pool(self) -> None:
+        """
+        Method opens all pool connections at once and returns them to pool, so first requests
+        do not wait for connections establishment.
+        :return: None
+        """
+        connections = await asyncio.gather(*(self._engine.connect() for _ in range(self._engine.pool.size())))
+        await asyncio.gather(*(connection.close() for connection in connections))
 
     def get_engine(self) -> AsyncEngine:
         """
@@ -139,14 +185,20 @@ class DatabaseManagerAsync(_DatabaseManager):
         """
         return self._engine
 
+    def get_session_maker(self) -> sessionmaker:
+        """
+        Method returns shared AsyncSession factory.
+        :return: session factory
+        """
+        return self._session_maker
+
     @contextlib.asynccontextmanager
     async def get_session(self) -> AsyncSession:
         """
         Context manager. Output is orm database asynchronous session
         :return:
         """
-        async_session = sessionmaker(self._engine, class_=AsyncSession)
-        async with async_session() as session:
+        async with self._session_maker() as session:
             try:
                 async with session.begin():
                     yield session
@@ -158,9 +210,17 @@ class DatabaseManagerAsync(_DatabaseManager):
         Method returns Sqlalchemy AsyncSession object
         :return: session object
         """
-        async_session = sessionmaker(self._engine, class_=AsyncSession)
-        async with async_session() as session:
+        async with self._session_maker() as session:
             try:
                 yield session
             finally:
                 await session.close()
+
+
+async def get_session() -> AsyncIterator[AsyncSession]:
+    """
+    FastAPI dependency. Yields Sqlalchemy AsyncSession object from shared session factory
+    :return: session object
+    """
+    async with DatabaseManagerAsync.get_instance().get_session_maker()() as session:
+        yield session
@@ -2,11 +2,11 @@
 Module contains sqlalchemy models for entire service.
 """
 import datetime
-from typing import Optional, TypeVar, List
+from typing import Optional, TypeVar, List, Iterable, Dict
 
 from fastapi import HTTPException, UploadFile
 import sqlalchemy
-from sqlalchemy import Column, Integer, String, DateTime, text, ForeignKey, Table, Float
+from sqlalchemy import Column, Integer, String, DateTime, text, ForeignKey, Table, Float, Index
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import declarative_base, relationship, selectinload
@@ -42,8 +42,9 @@ association_users_groups = Table(
 association_recipes_categories = Table(
     "assoc_recipes_categories",
     Base.metadata,
-    Column("recipe_id", ForeignKey("recipes.id")),
+    Column("recipe_id", ForeignKey("recipes.id", ondelete="CASCADE")),
     Column("category_id", ForeignKey("recipe_categories.id")),
+    Index("ix_assoc_recipes_categories_recipe_id_category_id", "recipe_id", "category_id"),
 )
 
 """
@@ -54,8 +55,9 @@ association_recipes_categories = Table(
 association_recipes_groups = Table(
     "assoc_recipes_groups",
     Base.metadata,
-    Column("recipe_id", ForeignKey("recipes.id")),
+    Column("recipe_id", ForeignKey("recipes.id", ondelete="CASCADE")),
     Column("group_id", ForeignKey("groups.id")),
+    Index("ix_assoc_recipes_groups_recipe_id_group_id", "recipe_id", "group_id"),
 )
 
 """
@@ -66,8 +68,9 @@ association_recipes_groups = Table(
 association_recipes_compilations = Table(
     "assoc_recipes_compilations",
     Base.metadata,
-    Column("recipe_id", ForeignKey("recipes.id")),
+    Column("recipe_id", ForeignKey("recipes.id", ondelete="CASCADE")),
     Column("group_id", ForeignKey("recipe_compilations.id", ondelete="RESTRICT")),
+    Index("ix_assoc_recipes_compilations_recipe_id_group_id", "recipe_id", "group_id"),
 )
 
 """
@@ -78,7 +81,8 @@ association_recipes_likes = Table(
     "assoc_recipes_likes",
     Base.metadata,
     Column("user_id", ForeignKey("users.id")),
-    Column("recipe_id", ForeignKey("recipes.id")),
+    Column("recipe_id", ForeignKey("recipes.id", ondelete="CASCADE")),
+    Index("ix_assoc_recipes_likes_recipe_id_user_id", "recipe_id", "user_id", unique=True),
 )
 
 """
@@ -412,6 +416,29 @@ class IngredientsGroups(Base):
             session.add(new_group)
             return new_group
 
+    @classmethod
+    async def get_many_by_names_or_create(cls, names: Iterable[str], session) \
+            -> Dict[str, IngredientsGroupsTypeVar]:
+        """
+        Method return ingredient groups by passed names with one query. Groups that do not exist will be created.
+        For additional info check app.database.models.base -> IngredientsGroups.
+
+        :param names: Groups names.
+        :param session: SQLAlchemy AsyncSession object.
+        :return: Ingredient group mapped objects by names.
+        """
+        names = set(names)
+        found_groups = {}
+        if names:
+            response = await session.execute(
+                sqlalchemy.select(IngredientsGroups).where(IngredientsGroups.name.in_(names)))
+            for group in response.scalars():
+                found_groups.setdefault(group.name, group)
+        for name in names - found_groups.keys():
+            found_groups[name] = IngredientsGroups(name=name)
+            session.add(found_groups[name])
+        return found_groups
+
     def __str__(self):
         """string represent of model"""
         return self.name
@@ -439,7 +466,7 @@ class Ingredients(Base):
 
     id = Column(Integer, primary_key=True, autoincrement=True, nullable=False)
     """ingredient id  (primary key, autogenerate)"""
-    name = Column(String, nullable=False)
+    name = Column(String, nullable=False, index=True)
     """ingredient name. Like apple, parrot, etc..."""
     groups = relationship("IngredientsGroups", back_populates="ingredients", secondary=association_ingredients_groups)
     """groups of this ingredient. See IngredientsGroups description"""
@@ -474,6 +501,41 @@ class Ingredients(Base):
         session.add(new_ingredient_model)
         return new_ingredient_model
 
+    @classmethod
+    async def get_many_by_names_or_create(cls, ingredients: List[CreateRecipeIngredientRequestModel],
+                                          session: AsyncSession) -> Dict[str, IngredientsTypeVar]:
+        """
+        Method return ingredients by passed names with one query. Ingredients that do not exist will be created
+        with their groups.
+        For additional info check app.database.models.base -> Ingredients.
+
+        :param ingredients: ingredients request objects.
+        :param session: SQLAlchemy AsyncSession object.
+        :return: Ingredient mapped objects by requested names.
+        """
+        names = {ingredient.name for ingredient in ingredients}
+        found_ingredients = {}
+        if names:
+            response = await session.execute(sqlalchemy.select(Ingredients).where(Ingredients.name.in_(names)))
+            for found_ingredient in response.scalars():
+                found_ingredients.setdefault(found_ingredient.name, found_ingredient)
+        missing_ingredients = [ingredient for ingredient in ingredients if ingredient.name not in found_ingredients]
+        if not missing_ingredients:
+            return found_ingredients
+        groups = await IngredientsGroups.get_many_by_names_or_create(
+            (group for ingredient in missing_ingredients for group in ingredient.groups), session)
+        # new ingredients are created by normalized name, so different spellings give one ingredient
+        new_ingredients = {}
+        for ingredient in missing_ingredients:
+            new_name = ingredient.name.lower().capitalize()
+            if new_name not in new_ingredients:
+                new_ingredients[new_name] = Ingredients(
+                    name=new_name,
+                    groups=[groups[group] for group in dict.fromkeys(ingredient.groups)])
+                session.add(new_ingredients[new_name])
+            found_ingredients[ingredient.name] = new_ingredients[new_name]
+        return found_ingredients
+
     @classmethod
     async def get_by_id(cls, ingredient_id: int, session: AsyncSession) \
             -> IngredientsTypeVar:
@@ -536,6 +598,29 @@ class RecipeDimensions(Base):
             session.add(found_dimension)
             return found_dimension
 
+    @classmethod
+    async def get_many_by_names_or_create(cls, dimensions: Iterable[str], session) \
+            -> Dict[str, RecipeDimensionsTypeVar]:
+        """
+        Method return dimensions by passed names with one query. Dimensions that do not exist will be created.
+        For additional info check app.database.models.base -> RecipeDimensions.
+
+        :param dimensions: Dimensions names.
+        :param session: SQLAlchemy AsyncSession object.
+        :return: Dimension mapped objects by names.
+        """
+        dimensions = set(dimensions)
+        found_dimensions = {}
+        if dimensions:
+            response = await session.execute(
+                sqlalchemy.select(RecipeDimensions).where(RecipeDimensions.name.in_(dimensions)))
+            for dimension in response.scalars():
+                found_dimensions.setdefault(dimension.name, dimension)
+        for dimension in dimensions - found_dimensions.keys():
+            found_dimensions[dimension] = RecipeDimensions(name=dimension)
+            session.add(found_dimensions[dimension])
+        return found_dimensions
+
 
 class RecipeIngredients(Base):
     """
@@ -567,6 +652,9 @@ class RecipeIngredients(Base):
     """
 
     __tablename__ = "recipe_ingredients"
+    __table_args__ = (
+        Index("ix_recipe_ingredients_recipe_id_ingredient_id", "recipe_id", "ingredient_id"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True, nullable=False)
     """recipe_ingredient id  (primary key, autogenerate)"""
@@ -587,7 +675,7 @@ class RecipeIngredients(Base):
     """id of dimension: Dimension"""
     dimension = relationship("RecipeDimensions", lazy="select")
     """dimension instance link"""
-    recipe_id = Column(Integer, ForeignKey("recipes.id"), nullable=False)
+    recipe_id = Column(Integer, ForeignKey("recipes.id", ondelete="CASCADE"), nullable=False)
     """id of recipe: Recipes"""
 
     def __str__(self):
@@ -614,6 +702,29 @@ class RecipeIngredients(Base):
         )
         return recipe_ingredient
 
+    @classmethod
+    async def create_many(cls, ingredients: List[CreateRecipeIngredientRequestModel], session) \
+            -> List[RecipeIngredientsTypeVar]:
+        """
+        Method will create RecipeIngredients objects. Ingredients and dimensions are selected with one query for each.
+        For additional info check app.database.models.base -> RecipeIngredients.
+
+        :param ingredients: Ingredient request objects.
+        :param session: SQLAlchemy AsyncSession object.
+        :return: Created ingredients.
+        """
+        ingredient_models = await Ingredients.get_many_by_names_or_create(ingredients, session)
+        dimension_models = await RecipeDimensions.get_many_by_names_or_create(
+            (ingredient.dimension for ingredient in ingredients), session)
+        return [
+            RecipeIngredients(
+                ingredient=ingredient_models[ingredient.name],
+                value=ingredient.weight,
+                dimension=dimension_models[ingredient.dimension],
+            )
+            for ingredient in ingredients
+        ]
+
 
 class RecipeCompilations(Base):
     """
@@ -636,7 +747,7 @@ class RecipeCompilations(Base):
     """recipes compilation id  (primary key, autogenerate)"""
     position = Column(Integer, primary_key=False, autoincrement=False, nullable=True)
     """Position of compilation"""
-    name = Column(String, nullable=False)
+    name = Column(String, nullable=False, index=True)
     """recipe compilation name"""
     image = Column(String, nullable=True)
     """path to compilation image in s3-compatible service. (i used minio, result like 'USERNAME/IMAGE_NAME.jpg')"""
@@ -697,12 +808,48 @@ class RecipeCompilations(Base):
             position: Optional[int],
             name: Optional[str],
             image: Optional[str],
-            recipes: List[RecipesTypeVar]
+            recipe_ids: Optional[List[int]]
     ):
-        compilation = await RecipeCompilations.get_by_id(session, compilation_id, [RecipeCompilations.recipes])
+        """
+        Method updates compilation. Recipes links are changed only for difference between current and passed
+        recipes, so the update cost depends on changes count instead of compilation size.
+
+        :param session: Sqlalchemy AsyncSession object
+        :param compilation_id: id of compilation
+        :param position: new compilation position
+        :param name: new compilation name
+        :param image: new compilation image
+        :param recipe_ids: ids of recipes that should be in compilation
+        :raises status.HTTP_404_NOT_FOUND: if compilation or one of recipes is not found
+        :return: None
+        """
+        compilation = await RecipeCompilations.get_by_id(session, compilation_id)
         compilation.name = name if name else compilation.name
         compilation.image = image if image else compilation.image
-        compilation.recipes = recipes if recipes else compilation.recipes
+        if recipe_ids:
+            response = await session.execute(
+                sqlalchemy.select(association_recipes_compilations.c.recipe_id)
+                .where(association_recipes_compilations.c.group_id == compilation_id)
+            )
+            current_recipe_ids = set(response.scalars().all())
+            recipe_ids_to_remove = current_recipe_ids - set(recipe_ids)
+            recipe_ids_to_add = set(recipe_ids) - current_recipe_ids
+            if recipe_ids_to_remove:
+                await session.execute(
+                    sqlalchemy.delete(association_recipes_compilations)
+                    .where(association_recipes_compilations.c.group_id == compilation_id)
+                    .where(association_recipes_compilations.c.recipe_id.in_(recipe_ids_to_remove))
+                )
+            if recipe_ids_to_add:
+                response = await session.execute(
+                    sqlalchemy.select(Recipes.id).where(Recipes.id.in_(recipe_ids_to_add))
+                )
+                if len(response.scalars().all()) != len(recipe_ids_to_add):
+                    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Рецепт не найден")
+                await session.execute(
+                    sqlalchemy.insert(association_recipes_compilations),
+                    [{"recipe_id": recipe_id, "group_id": compilation_id} for recipe_id in recipe_ids_to_add]
+                )
         if position and position != compilation.position:
             all_compilations = await RecipeCompilations.get_all(session)
             all_positions = [compilation.position for compilation in all_compilations]
@@ -762,7 +909,7 @@ class RecipeCategories(Base):
 
     id = Column(Integer, primary_key=True, autoincrement=True, nullable=False)
     "recipe category id  (primary key, autogenerate)"
-    name = Column(String, nullable=False)
+    name = Column(String, nullable=False, index=True)
     "recipe category name"
     image = Column(String, nullable=True)
     "recipe category image"
@@ -837,6 +984,29 @@ class RecipeCategories(Base):
             category = RecipeCategories(name=name)
             return category
 
+    @classmethod
+    async def get_many_by_names_or_create(cls, names: Iterable[str], session: AsyncSession) \
+            -> Dict[str, RecipeCategoriesTypeVar]:
+        """
+        Method return categories by passed names with one query. Categories that do not exist will be created.
+        For additional info check app.database.models.base -> RecipeCategories.
+
+        :param names: Categories names.
+        :param session: SQLAlchemy AsyncSession object.
+        :return: Category mapped objects by names.
+        """
+        names = set(names)
+        found_categories = {}
+        if names:
+            response = await session.execute(
+                sqlalchemy.select(RecipeCategories).where(RecipeCategories.name.in_(names)))
+            for category in response.scalars():
+                found_categories.setdefault(category.name, category)
+        for name in names - found_categories.keys():
+            found_categories[name] = RecipeCategories(name=name)
+            session.add(found_categories[name])
+        return found_categories
+
 
 class RecipeSteps(Base):
     """
@@ -868,7 +1038,7 @@ class RecipeSteps(Base):
     """step number (1,2,3...)"""
     content = Column(String, nullable=False)
     """step content (text)"""
-    recipe_id = Column(Integer, ForeignKey("recipes.id"))
+    recipe_id = Column(Integer, ForeignKey("recipes.id", ondelete="CASCADE"))
     """id of recipe: Recipes"""
     recipe = relationship("Recipes", back_populates="steps")
     """Recipes model link"""
@@ -1148,41 +1318,48 @@ class Recipes(Base):
     """recipe complexity (easy/medium/hard/etc...)"""
     servings = Column(Integer, nullable=False)
     """recipe servings"""
-    steps = relationship("RecipeSteps", cascade="all, delete")
+    steps = relationship("RecipeSteps", cascade="all, delete", passive_deletes=True)
     """RecipeSteps model links"""
-    categories = relationship("RecipeCategories", secondary=association_recipes_categories, back_populates="recipes")
+    categories = relationship("RecipeCategories", secondary=association_recipes_categories, back_populates="recipes",
+                              passive_deletes=True)
     """RecipeCategories model links"""
-    ingredients: List[RecipeIngredientsTypeVar] = relationship("RecipeIngredients", cascade="all, delete")
+    ingredients: List[RecipeIngredientsTypeVar] = relationship("RecipeIngredients", cascade="all, delete",
+                                                               passive_deletes=True)
     """RecipeIngredients model links"""
     compilations = relationship(
         "RecipeCompilations",
         secondary=association_recipes_compilations,
-        back_populates="recipes"
+        back_populates="recipes",
+        passive_deletes=True,
     )
     """RecipeCompilations model links"""
-    allowed_groups = relationship("Groups", secondary=association_recipes_groups)
+    allowed_groups = relationship("Groups", secondary=association_recipes_groups, passive_deletes=True)
     """Groups model links"""
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
     """id of user: Users"""
     user = relationship("Users", back_populates="created_recipes")
     """Users model link of user that creates this recipe"""
-    liked_by = relationship("Users", secondary=association_recipes_likes, back_populates="liked_recipes")
+    liked_by = relationship("Users", secondary=association_recipes_likes, back_populates="liked_recipes",
+                            passive_deletes=True)
     """Users model links of users that likes this recipe"""
 
     @classmethod
-    async def get_by_id(cls, recipe_id: int, session: AsyncSession, join_tables: list = ()):
+    async def get_by_id(cls, recipe_id: int, session: AsyncSession, join_tables: list = (), options: Iterable = ()):
         """
             Method search recipe by passed id. If recipe not found, then it throws
             404_NOT_FOUND exception
 
             :param recipe_id: id of recipe.
             :param session: SQLAlchemy AsyncSession object.
+            :param join_tables: relationships that should be loaded with selectinload
+            :param options: loader options for query (for nested relationships)
             :return: Found recipe.
             """
         stmt = (
             sqlalchemy.select(Recipes)
             .where(Recipes.id == recipe_id)
             .limit(1)
+            .options(*options)
         )
         # stmt.options(selectinload(Ingredients.groups))
         if join_tables:
@@ -1221,11 +1398,15 @@ class Recipes(Base):
 
     @classmethod
     async def get_liked(cls, user_id: int, session: AsyncSession) -> List[RecipesTypeVar]:
+        # likes are checked in likes table, so users who liked recipes are not loaded
         stmt = (
             sqlalchemy
             .select(Recipes)
-            .options(selectinload(Recipes.liked_by))
-            .filter(Users.id == user_id)
+            .where(
+                sqlalchemy.exists()
+                .where(association_recipes_likes.c.recipe_id == Recipes.id)
+                .where(association_recipes_likes.c.user_id == user_id)
+            )
         )
         response = await session.execute(stmt)
         recipes: List[Recipes] = response.scalars().all()
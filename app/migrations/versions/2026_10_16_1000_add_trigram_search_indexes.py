@@ -0,0 +1,32 @@
+"""add trigram search indexes
+
+Revision ID: 2026_10_16_1000
+Revises: 2023_05_12_1531
+Create Date: 2026-10-16 10:00:12.402815
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2026_10_16_1000'
+down_revision = '2023_05_12_1531'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index('ix_recipes_title_trgm', 'recipes', [sa.text('lower(title) gin_trgm_ops')],
+                    postgresql_using='gin')
+    op.create_index('ix_ingredients_name_trgm', 'ingredients', [sa.text('lower(name) gin_trgm_ops')],
+                    postgresql_using='gin')
+    op.create_index('ix_recipe_categories_name_trgm', 'recipe_categories', [sa.text('lower(name) gin_trgm_ops')],
+                    postgresql_using='gin')
+
+
+def downgrade():
+    op.drop_index('ix_recipe_categories_name_trgm', table_name='recipe_categories')
+    op.drop_index('ix_ingredients_name_trgm', table_name='ingredients')
+    op.drop_index('ix_recipes_title_trgm', table_name='recipes')
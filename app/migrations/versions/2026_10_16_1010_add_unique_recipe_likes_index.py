@@ -0,0 +1,29 @@
+"""add unique recipe likes index
+
+Revision ID: 2026_10_16_1010
+Revises: 2026_10_16_1000
+Create Date: 2026-10-16 10:10:41.118304
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '2026_10_16_1010'
+down_revision = '2026_10_16_1000'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # remove duplicated likes before unique index creation
+    op.execute(
+        "DELETE FROM assoc_recipes_likes a USING assoc_recipes_likes b "
+        "WHERE a.ctid > b.ctid AND a.recipe_id = b.recipe_id AND a.user_id = b.user_id"
+    )
+    op.create_index('ix_assoc_recipes_likes_recipe_id_user_id', 'assoc_recipes_likes', ['recipe_id', 'user_id'],
+                    unique=True)
+
+
+def downgrade():
+    op.drop_index('ix_assoc_recipes_likes_recipe_id_user_id', table_name='assoc_recipes_likes')
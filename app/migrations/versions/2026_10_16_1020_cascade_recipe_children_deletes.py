@@ -0,0 +1,31 @@
+"""cascade recipe children deletes
+
+Revision ID: 2026_10_16_1020
+Revises: 2026_10_16_1010
+Create Date: 2026-10-16 10:20:07.530942
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '2026_10_16_1020'
+down_revision = '2026_10_16_1010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.drop_constraint('recipe_ingredients_recipe_id_fkey', 'recipe_ingredients', type_='foreignkey')
+    op.create_foreign_key('recipe_ingredients_recipe_id_fkey', 'recipe_ingredients', 'recipes', ['recipe_id'], ['id'],
+                          ondelete='CASCADE')
+    op.drop_constraint('recipe_steps_recipe_id_fkey', 'recipe_steps', type_='foreignkey')
+    op.create_foreign_key('recipe_steps_recipe_id_fkey', 'recipe_steps', 'recipes', ['recipe_id'], ['id'],
+                          ondelete='CASCADE')
+
+
+def downgrade():
+    op.drop_constraint('recipe_steps_recipe_id_fkey', 'recipe_steps', type_='foreignkey')
+    op.create_foreign_key('recipe_steps_recipe_id_fkey', 'recipe_steps', 'recipes', ['recipe_id'], ['id'])
+    op.drop_constraint('recipe_ingredients_recipe_id_fkey', 'recipe_ingredients', type_='foreignkey')
+    op.create_foreign_key('recipe_ingredients_recipe_id_fkey', 'recipe_ingredients', 'recipes', ['recipe_id'], ['id'])
@@ -0,0 +1,38 @@
+"""add recipe filters indexes
+
+Revision ID: 2026_10_16_1030
+Revises: 2026_10_16_1020
+Create Date: 2026-10-16 10:30:27.531946
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '2026_10_16_1030'
+down_revision = '2026_10_16_1020'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_assoc_recipes_categories_recipe_id_category_id', 'assoc_recipes_categories',
+                    ['recipe_id', 'category_id'])
+    op.create_index('ix_assoc_recipes_groups_recipe_id_group_id', 'assoc_recipes_groups', ['recipe_id', 'group_id'])
+    op.create_index('ix_assoc_recipes_compilations_recipe_id_group_id', 'assoc_recipes_compilations',
+                    ['recipe_id', 'group_id'])
+    op.create_index('ix_recipe_ingredients_recipe_id_ingredient_id', 'recipe_ingredients',
+                    ['recipe_id', 'ingredient_id'])
+    op.create_index('ix_ingredients_name', 'ingredients', ['name'])
+    op.create_index('ix_recipe_categories_name', 'recipe_categories', ['name'])
+    op.create_index('ix_recipe_compilations_name', 'recipe_compilations', ['name'])
+
+
+def downgrade():
+    op.drop_index('ix_recipe_compilations_name', table_name='recipe_compilations')
+    op.drop_index('ix_recipe_categories_name', table_name='recipe_categories')
+    op.drop_index('ix_ingredients_name', table_name='ingredients')
+    op.drop_index('ix_recipe_ingredients_recipe_id_ingredient_id', table_name='recipe_ingredients')
+    op.drop_index('ix_assoc_recipes_compilations_recipe_id_group_id', table_name='assoc_recipes_compilations')
+    op.drop_index('ix_assoc_recipes_groups_recipe_id_group_id', table_name='assoc_recipes_groups')
+    op.drop_index('ix_assoc_recipes_categories_recipe_id_category_id', table_name='assoc_recipes_categories')
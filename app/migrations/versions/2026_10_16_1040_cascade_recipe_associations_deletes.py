@@ -0,0 +1,35 @@
+"""cascade recipe associations deletes
+
+Revision ID: 2026_10_16_1040
+Revises: 2026_10_16_1030
+Create Date: 2026-10-16 10:40:51.208317
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '2026_10_16_1040'
+down_revision = '2026_10_16_1030'
+branch_labels = None
+depends_on = None
+
+# association tables that reference recipes by recipe_id column
+ASSOCIATION_TABLES = (
+    'assoc_recipes_categories',
+    'assoc_recipes_groups',
+    'assoc_recipes_compilations',
+    'assoc_recipes_likes',
+)
+
+
+def upgrade():
+    for table in ASSOCIATION_TABLES:
+        op.drop_constraint(f'{table}_recipe_id_fkey', table, type_='foreignkey')
+        op.create_foreign_key(f'{table}_recipe_id_fkey', table, 'recipes', ['recipe_id'], ['id'], ondelete='CASCADE')
+
+
+def downgrade():
+    for table in reversed(ASSOCIATION_TABLES):
+        op.drop_constraint(f'{table}_recipe_id_fkey', table, type_='foreignkey')
+        op.create_foreign_key(f'{table}_recipe_id_fkey', table, 'recipes', ['recipe_id'], ['id'])
@@ -1 +1,2 @@
 from app.utils.s3_service import S3Manager
+from app.utils.cache import TTLCache
@@ -0,0 +1,82 @@
+"""Simple in-process cache with entries expiration"""
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class TTLCache:
+    """
+    In-process cache with time to live for every entry. When cache is full, least recently used entry is removed.
+
+    Description: cache is not shared between application workers, so it should be used only for short-lived entries,
+    that can be a bit stale.
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 1024):
+        """
+        Method initialize cache.
+
+        :param ttl: entry time to live in seconds
+        :param maxsize: max entries count
+        """
+        self._ttl = ttl
+        self._maxsize = maxsize
+        self._entries: OrderedDict = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Method returns cached value or None if value is not cached or expired.
+
+        :param key: entry key
+        :return: cached value
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expire_at, value = entry
+        if expire_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Method stores value in cache.
+
+        :param key: entry key
+        :param value: value to store
+        :return: None
+        """
+        self._entries[key] = (time.monotonic() + self._ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        """
+        Method removes entry from cache.
+
+        :param key: entry key
+        :return: None
+        """
+        self._entries.pop(key, None)
+
+    def pop_by_value(self, predicate: Callable[[Any], bool]) -> None:
+        """
+        Method removes all entries with values matched by predicate. Method checks every entry, so it should be
+        used only for rare invalidations.
+
+        :param predicate: function that receives cached value and returns True if entry should be removed
+        :return: None
+        """
+        for key in [key for key, (_, value) in self._entries.items() if predicate(value)]:
+            del self._entries[key]
+
+    def clear(self) -> None:
+        """
+        Method removes all entries from cache.
+
+        :return: None
+        """
+        self._entries.clear()
@@ -1,7 +1,8 @@
 """
 Module contains AWS S3 compatible manager for file manipulation.
 """
-import io
+import asyncio
+from typing import Iterable, List, Optional
 
 import boto3
 import logging
@@ -11,6 +12,7 @@ from fastapi import UploadFile
 
 from app.api.routes.v1.utils.utility import convert_pillow_image_to_jpg_bytes
 from app.config import settings
+from app.constants import S3_MAX_CONCURRENT_UPLOADS
 
 class S3Manager:
     """
@@ -18,7 +20,9 @@ class S3Manager:
     Can send files (from drive or memory) and generate links on these files by key.
     """
     _bucket: str
+    _base_url: str
     _instance = None
+    _uploads_semaphore = asyncio.Semaphore(S3_MAX_CONCURRENT_UPLOADS)
 
 
     def __init__(self):
@@ -31,6 +35,7 @@ class S3Manager:
                                       endpoint_url=settings.s3.endpoint,
                                       )
         self._bucket = settings.s3.bucket
+        self._base_url = f"http://{settings.s3.host}:{settings.s3.port}/{settings.s3.bucket}"
 
     @classmethod
     def get_instance(cls) -> 'S3Manager':
@@ -63,31 +68,25 @@ class S3Manager:
         :param base_filename: base filename
         :return:
         """
-        image_bytes = image.file.read()
-        # big image
-        filename_big = f"{base_filename}_big.jpg"
-        self.send_memory_file_to_s3(
-            convert_pillow_image_to_jpg_bytes(ImageOps.contain(Image.open(io.BytesIO(image_bytes)), (2048, 2048))),
-            filename_big
-        )
-        # medium image
-        filename_med = f"{base_filename}_med.jpg"
-        self.send_memory_file_to_s3(
-            convert_pillow_image_to_jpg_bytes(ImageOps.contain(Image.open(io.BytesIO(image_bytes)), (1024, 1024))),
-            filename_med
-        )
-        # small image
-        filename_small = f"{base_filename}_small.jpg"
-        self.send_memory_file_to_s3(
-            convert_pillow_image_to_jpg_bytes(ImageOps.contain(Image.open(io.BytesIO(image_bytes)), (512, 512))),
-            filename_small
-        )
-        # micro image
-        filename_micro = f"{base_filename}_micro.jpg"
-        self.send_memory_file_to_s3(
-            convert_pillow_image_to_jpg_bytes(ImageOps.contain(Image.open(io.BytesIO(image_bytes)), (256, 256))),
-            filename_micro
-        )
+        # image is decoded once straight from spooled upload file, without copying whole file to memory
+        image.file.seek(0)
+        shaped_image = Image.open(image.file)
+        # each next size is made from previous (already reduced) one, so full size image is resized only once
+        for suffix, size in (("big", 2048), ("med", 1024), ("small", 512), ("micro", 256)):
+            shaped_image = ImageOps.contain(shaped_image, (size, size))
+            self.send_memory_file_to_s3(convert_pillow_image_to_jpg_bytes(shaped_image), f"{base_filename}_{suffix}.jpg")
+
+    async def send_image_shaped_async(self, image: UploadFile, base_filename):
+        """
+        Method does the same as send_image_shaped, but in thread pool, so event loop is not blocked by
+        image resizing and uploading. Count of simultaneous uploads is limited by S3_MAX_CONCURRENT_UPLOADS.
+
+        :param image: UploadFile FastApi object
+        :param base_filename: base filename
+        :return:
+        """
+        async with self._uploads_semaphore:
+            await asyncio.to_thread(self.send_image_shaped, image=image, base_filename=base_filename)
 
     def send_memory_file_to_s3(self, file, object_key) -> None:
         """
@@ -106,5 +105,18 @@ class S3Manager:
         :param object_key: key of object.
         :return: link to object.
         """
-        return f"http://{settings.s3.host}:{settings.s3.port}/{settings.s3.bucket}/{object_key.replace(' ', '%20')}"
+        return f"{self._base_url}/{object_key.replace(' ', '%20')}"
+
+    def get_urls(self, object_keys: Iterable[Optional[str]]) -> List[Optional[str]]:
+        """
+        Method creates links to s3 objects. Links are not signed, so they are built locally without requests to s3.
+
+        :param object_keys: keys of objects. If key is None, then link is None too.
+        :return: links to objects in the same order.
+        """
+        base_url = self._base_url
+        return [
+            f"{base_url}/{object_key.replace(' ', '%20')}" if object_key is not None else None
+            for object_key in object_keys
+        ]
 